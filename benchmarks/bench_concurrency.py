@@ -0,0 +1,76 @@
+"""
+Concurrent throughput and latency of the sync routes as the threadpool grows.
+
+A threadpool of 1 handles one request's database work at a time, which is
+how the old async def routes behaved while blocking the event loop. Work that
+holds the GIL (ORM hydration, pydantic) does not scale past one core in a
+single process, run more uvicorn workers for that.
+python -m benchmarks.bench_concurrency
+"""
+
+import asyncio
+import statistics
+import time
+
+import httpx
+from anyio import to_thread
+from sqlmodel import Session
+
+from benchmarks.common import build_database
+from src.app.main import app, get_session
+
+PATHS = [
+    "/dqm1/monsters",
+    "/dqm1/monstersandskill/110",
+    "/dqm1/skills",
+    "/dqm1/breeding/5",
+    "/dqm1/items",
+]
+REQUESTS = 400
+CONCURRENCY = 32
+THREADPOOL_SIZES = [1, 4, 16, 40]
+
+
+async def run(threadpool_size: int):
+    to_thread.current_default_thread_limiter().total_tokens = threadpool_size
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        queue = [PATHS[i % len(PATHS)] for i in range(REQUESTS)]
+
+        async def worker():
+            while queue:
+                path = queue.pop()
+                start = time.perf_counter()
+                response = await c.get(path)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+        elapsed = time.perf_counter() - start
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return REQUESTS / elapsed, percentiles[49] * 1000, percentiles[94] * 1000
+
+
+def main():
+    engine = build_database(pool_size=max(THREADPOOL_SIZES), max_overflow=0)
+
+    def get_session_override():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+
+    print(f"{REQUESTS} requests, {CONCURRENCY} concurrent clients")
+    for size in THREADPOOL_SIZES:
+        rps, p50, p95 = asyncio.run(run(size))
+        print(
+            f"threadpool size {size:>3}: {rps:8.1f} requests/sec  "
+            f"p50 {p50:7.1f} ms  p95 {p95:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
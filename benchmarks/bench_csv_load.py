@@ -0,0 +1,64 @@
+"""
+Time to build a new database from the csv files: the bulk loader in
+create_database.py against the previous row-by-row loader.
+python -m benchmarks.bench_csv_load
+"""
+
+import csv
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, List, Tuple, cast
+
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from src.app.create_database import CSV_TABLES, load_all_csv_data
+
+RUNS = 5
+
+
+def row_by_row_load(db_engine):
+    """
+    the previous loader: a SELECT per csv row to skip existing ids, then one
+    ORM object per row
+    """
+    SQLModel.metadata.create_all(db_engine)
+    # the csv models all have an id column, which SQLModel's type doesn't know
+    for csv_file, Model in cast(List[Tuple[Path, Any]], CSV_TABLES):
+        with Session(db_engine) as session:
+            with open(csv_file, encoding="utf-8-sig") as f:
+                reader = csv.DictReader(f)
+                for row in reader:
+                    row = {k: (None if v == "" else v) for k, v in row.items()}
+                    if "id" in row:
+                        existing_entry = session.exec(
+                            select(Model).where(Model.id == row["id"])
+                        ).first()
+                        if existing_entry:
+                            continue
+                    session.add(Model(**row))
+            session.commit()
+
+
+def time_loader(loader) -> float:
+    timings = []
+    for _ in range(RUNS):
+        db_path = Path(tempfile.mkdtemp()) / "benchmark.db"
+        db_engine = create_engine(f"sqlite:///{db_path}")
+        start = time.perf_counter()
+        loader(db_engine)
+        timings.append(time.perf_counter() - start)
+        db_engine.dispose()
+    return min(timings)
+
+
+def main():
+    row_by_row = time_loader(row_by_row_load)
+    bulk = time_loader(load_all_csv_data)
+    print(f"best of {RUNS} runs")
+    print(f"row by row loader: {row_by_row * 1000:8.1f} ms")
+    print(f"bulk loader:       {bulk * 1000:8.1f} ms  ({row_by_row / bulk:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Per-request cost of the routes under different engine settings
+(see Settings in src/app/settings.py).
+Echoed SQL goes through a logging.FileHandler to a log file, like a server
+writing its logs, instead of the console. The configurations take turns, in a
+new order every repeat, so changes in machine load hit all of them alike.
+python -m benchmarks.bench_engine_settings
+"""
+
+import logging
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from fastapi.testclient import TestClient
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from src.app.create_database import bake_database
+from src.app.database import create_db_engine
+from src.app.main import app, get_session
+from src.app.settings import Settings
+
+PATHS = [
+    "/dqm1/monsters/110",
+    "/dqm1/monstersandskill/110",
+    "/dqm1/family/4",
+    "/dqm1/skills/2",
+    "/dqm1/skillcombine/4",
+    "/dqm1/items/3",
+]
+ROUNDS = 20
+REPEATS = 15
+
+CONFIGURATIONS = {
+    "echo on, queue pool (old default)": Settings(db_echo=True),
+    "echo off, queue pool": Settings(),
+    "echo off, null pool": Settings(db_pool="null"),
+    "echo off, static pool": Settings(db_pool="static"),
+    "echo off, singleton pool": Settings(db_pool="singleton"),
+    "queue pool + cache/mmap/temp_store": Settings(
+        db_cache_size=-16000, db_mmap_size=2**28, db_temp_store="MEMORY"
+    ),
+    "read-only immutable + mmap": Settings(db_readonly=True, db_mmap_size=2**28),
+}
+
+
+def log_echo_to(log_path: Path) -> logging.Handler:
+    """
+    sends the echoed SQL to log_path, formatted like SQLAlchemy's own echo
+    handler (which is only added when the logger has no handler)
+    """
+    handler = logging.FileHandler(log_path)
+    handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s")
+    )
+    logging.getLogger("sqlalchemy.engine.Engine").addHandler(handler)
+    return handler
+
+
+def per_request_ms(client: TestClient, db_engine: Engine) -> float:
+    def get_session_override():
+        with Session(db_engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    for path in PATHS:
+        client.get(path)
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for path in PATHS:
+            client.get(path)
+    elapsed = time.perf_counter() - start
+
+    app.dependency_overrides.clear()
+    return elapsed / (ROUNDS * len(PATHS)) * 1000
+
+
+def main():
+    db_dir = Path(tempfile.mkdtemp())
+    db_path = db_dir / "benchmark.db"
+    bake_database(db_path)
+    log_handler = log_echo_to(db_dir / "echo.log")
+
+    engines = {
+        name: create_db_engine(db_path, db_settings)
+        for name, db_settings in CONFIGURATIONS.items()
+    }
+    timings: Dict[str, List[float]] = {name: [] for name in engines}
+    client = TestClient(app)
+    for _ in range(REPEATS):
+        names = list(engines)
+        random.shuffle(names)
+        for name in names:
+            timings[name].append(per_request_ms(client, engines[name]))
+
+    for db_engine in engines.values():
+        db_engine.dispose()
+    log_handler.close()
+
+    print(
+        f"{ROUNDS * len(PATHS)} sequential requests per configuration, "
+        f"{REPEATS} interleaved repeats (median / min)"
+    )
+    for name, ms in timings.items():
+        print(f"{name:<38} {statistics.median(ms):6.2f} / {min(ms):6.2f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Time to turn the full monster, skill and breeding lists into a response body:
+FastAPI's validation/jsonable_encoder step, then rendering with the standard
+library json module (JSONResponse) or orjson (ORJSONResponse, DQM_ORJSON=1).
+python -m benchmarks.bench_json_encoding
+"""
+
+import time
+from typing import List
+
+import anyio
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlmodel import Session
+
+from benchmarks.common import build_database
+from src.app.models import MonsterBreedingLinkReadWithInfo, MonsterDetailWithFamily
+from src.app.snapshot import Snapshot
+
+ROUNDS = 50
+
+
+def endpoint_contents(snapshot: Snapshot):
+    """
+    (name, response_model, content) for each list, as the route returns it
+    """
+    breeding = [
+        combo
+        for monster_id in snapshot.monsters_by_id
+        for combo in snapshot.breeding_index.combos(monster_id)
+    ]
+    return [
+        (
+            "monsters",
+            List[MonsterDetailWithFamily],
+            snapshot.read_monsters(),
+        ),
+        # read_skills has no response_model, jsonable_encoder walks the ORM rows
+        ("skills", None, snapshot.read_skills()),
+        ("breeding", List[MonsterBreedingLinkReadWithInfo], breeding),
+    ]
+
+
+def per_call_ms(function, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        function(*args)
+    return (time.perf_counter() - start) / ROUNDS * 1000
+
+
+def main():
+    engine = build_database()
+    with Session(engine) as session:
+        snapshot = Snapshot.load(session)
+
+    print(f"{'list':<9} {'rows':>5} {'validate':>9} {'json':>9} {'orjson':>9}")
+    for name, response_model, content in endpoint_contents(snapshot):
+        field = None
+        if response_model is not None:
+            field = create_model_field(name=name, type_=response_model)
+
+        def validate():
+            return anyio.run(
+                lambda: serialize_response(field=field, response_content=content)
+            )
+
+        serialized = validate()
+        assert JSONResponse(serialized).body == ORJSONResponse(serialized).body
+        print(
+            f"{name:<9} {len(content):>5} "
+            f"{per_call_ms(validate):>6.2f} ms "
+            f"{per_call_ms(JSONResponse, serialized):>6.2f} ms "
+            f"{per_call_ms(ORJSONResponse, serialized):>6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
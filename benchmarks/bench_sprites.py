@@ -0,0 +1,81 @@
+"""
+Sprites served per second by the /static mount (a stat and a file read per
+request) and the in-memory /sprites mount, calling each ASGI app directly so
+no HTTP client or server is timed.
+python -m benchmarks.bench_sprites
+"""
+
+import time
+from urllib.parse import quote
+
+import anyio
+from fastapi.staticfiles import StaticFiles
+
+from src.app.database import project_dir
+from src.app.sprites import SpriteFiles, SpriteStore
+
+ROUNDS = 20
+SPRITE_DIR = project_dir / "static/images/dqm1monsters"
+
+
+def make_scope(root_path: str, path: str):
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": root_path + path,
+        "raw_path": (root_path + quote(path)).encode(),
+        "root_path": root_path,
+        "query_string": b"",
+        "headers": [],
+    }
+
+
+async def serve_all(asgi_app, scopes) -> int:
+    served = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal served
+        if message["type"] == "http.response.body" and not message.get(
+            "more_body", False
+        ):
+            served += 1
+
+    for _ in range(ROUNDS):
+        for scope in scopes:
+            await asgi_app(scope, receive, send)
+    return served
+
+
+def sprites_per_second(asgi_app, scopes) -> float:
+    start = time.perf_counter()
+    served = anyio.run(serve_all, asgi_app, scopes)
+    return served / (time.perf_counter() - start)
+
+
+def main():
+    store = SpriteStore.from_directory(SPRITE_DIR)
+    static_scopes = [
+        make_scope("/static", f"/images/dqm1monsters/{name}") for name in store.sprites
+    ]
+    sprite_scopes = [
+        make_scope("/sprites", f"/{sprite.content_hash}/{sprite.name}")
+        for sprite in store.sprites.values()
+    ]
+    static_files = StaticFiles(directory=project_dir / "static")
+
+    print(f"{ROUNDS * len(store.sprites)} sprite requests per mount")
+    print(
+        f"StaticFiles /static      {sprites_per_second(static_files, static_scopes):8.0f}"
+        " sprites/s"
+    )
+    print(
+        f"in-memory   /sprites     "
+        f"{sprites_per_second(SpriteFiles(store), sprite_scopes):8.0f} sprites/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
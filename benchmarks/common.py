@@ -0,0 +1,24 @@
+"""
+Shared helpers for the benchmark scripts in this folder.
+Run benchmarks from the project folder, e.g.
+python -m benchmarks.bench_concurrency
+"""
+
+import tempfile
+from pathlib import Path
+
+from sqlalchemy.engine import Engine
+from sqlmodel import create_engine
+
+from src.app.create_database import load_all_csv_data
+
+
+def build_database(**engine_kwargs) -> Engine:
+    """
+    loads every csv file into a new sqlite file in a temp folder and returns
+    an engine for it
+    """
+    db_path = Path(tempfile.mkdtemp()) / "benchmark.db"
+    engine = create_engine(f"sqlite:///{db_path}", **engine_kwargs)
+    load_all_csv_data(engine)
+    return engine
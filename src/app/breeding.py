@@ -0,0 +1,355 @@
+import logging
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import inspect
+from sqlmodel import Session, col, select
+
+from src.app.models import (
+    BreedingPlan,
+    BreedingPlanNode,
+    MonsterBreedingExpansion,
+    MonsterBreedingLink,
+    MonsterDetail,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class BreedingIndex:
+    """
+    Adjacency index over the breeding combinations, built once.
+
+    Every combination is listed under the monster it produces (as_child) and
+    under the specific monsters used as parents (as_pedigree, as_parent2).
+    Combinations taking any monster of a family as a parent
+    (pedigree_family_id/family2_id) are listed under each member of the
+    family in as_family_parent, from family_parents: (link id, monster id)
+    pairs read from the MonsterBreedingExpansion table.
+    """
+
+    def __init__(
+        self,
+        links: Iterable[MonsterBreedingLink],
+        family_parents: Iterable[Tuple[int, int]] = (),
+    ):
+        self.links = sorted(links, key=lambda link: link.id or 0)
+        self.as_child: Dict[int, List[MonsterBreedingLink]] = defaultdict(list)
+        self.as_pedigree: Dict[int, List[MonsterBreedingLink]] = defaultdict(list)
+        self.as_parent2: Dict[int, List[MonsterBreedingLink]] = defaultdict(list)
+
+        # every combination a monster shows up in, in id order, with a
+        # combination listed once even if the monster fills several slots
+        self._combos: Dict[int, List[MonsterBreedingLink]] = defaultdict(list)
+
+        for link in self.links:
+            if link.child_id is not None:
+                self.as_child[link.child_id].append(link)
+            if link.pedigree_id is not None:
+                self.as_pedigree[link.pedigree_id].append(link)
+            if link.parent2_id is not None:
+                self.as_parent2[link.parent2_id].append(link)
+            for monster_id in {link.child_id, link.pedigree_id, link.parent2_id}:
+                if monster_id is not None:
+                    self._combos[monster_id].append(link)
+
+        links_by_id = {link.id: link for link in self.links}
+        self.as_family_parent: Dict[int, List[MonsterBreedingLink]] = defaultdict(list)
+        for link_id, monster_id in sorted(set(family_parents)):
+            if link_id in links_by_id:
+                self.as_family_parent[monster_id].append(links_by_id[link_id])
+        # _combos plus the combinations the monster joins through its family
+        self._combos_with_family: Dict[int, List[MonsterBreedingLink]] = {}
+        for monster_id, family_links in self.as_family_parent.items():
+            combos = {link.id: link for link in self._combos.get(monster_id, [])}
+            combos.update((link.id, link) for link in family_links)
+            self._combos_with_family[monster_id] = sorted(
+                combos.values(), key=lambda link: link.id or 0
+            )
+
+    @classmethod
+    def load(cls, session: Session) -> "BreedingIndex":
+        return cls(
+            session.exec(select(MonsterBreedingLink)).all(),
+            cls.load_family_parents(session),
+        )
+
+    @staticmethod
+    def load_family_parents(session: Session) -> List[Tuple[int, int]]:
+        """
+        (link id, monster id) for every monster filling a family-wide parent
+        slot of a combination, from the expansion table. A database made
+        before that table existed has none: the app still starts, without
+        family-wide parents, and logs how to add them.
+        """
+        expansion = MonsterBreedingExpansion
+        table_name = str(expansion.__tablename__)
+        if not inspect(session.get_bind()).has_table(table_name):
+            logger.warning(
+                "no %s table, breeding lookups skip family-wide parents; run "
+                "python src/app/create_database.py --expand-families to add it",
+                table_name,
+            )
+            return []
+        link = MonsterBreedingLink
+        pedigrees = (
+            select(expansion.link_id, expansion.pedigree_id)
+            .join(link, col(link.id) == expansion.link_id)
+            .where(col(link.pedigree_id).is_(None))
+        )
+        parents2 = (
+            select(expansion.link_id, expansion.parent2_id)
+            .join(link, col(link.id) == expansion.link_id)
+            .where(col(link.parent2_id).is_(None))
+        )
+        rows = session.execute(pedigrees.union(parents2)).all()
+        return [(link_id, monster_id) for link_id, monster_id in rows]
+
+    def combos(
+        self, monster_id: int, include_family: bool = False
+    ) -> List[MonsterBreedingLink]:
+        """
+        all combinations that make monster_id or use it as a parent, and with
+        include_family those taking it as any monster of its family
+        """
+        if include_family and monster_id in self._combos_with_family:
+            return self._combos_with_family[monster_id]
+        return self._combos.get(monster_id, [])
+
+
+# a parent slot of a combination: (monster_id, family_id), exactly one is set
+Slot = Tuple[Optional[int], Optional[int]]
+
+
+class PlanStep(NamedTuple):
+    """
+    cheapest known way to get a monster at one search depth.
+    combo_id is None when the monster comes straight from the roster.
+    """
+
+    breedings: int
+    combo_id: Optional[int] = None
+    pedigree_id: Optional[int] = None
+    parent2_id: Optional[int] = None
+
+
+class BreedingPlanner:
+    """
+    Finds the cheapest breeding tree that makes a target monster from a
+    roster of owned monsters.
+
+    Cost is the number of breedings in the tree. Family-wide parent slots
+    (pedigree_family_id/family2_id) are filled with the cheapest monster of
+    that family (MonsterDetail.family_id). Roster monsters can be used as
+    parents any number of times.
+
+    Depth d of the search holds the cheapest way to get every monster with a
+    tree at most d generations deep. It is computed from depth d - 1 for all
+    monsters at once, and memoized per (roster, max_depth), so any number of
+    targets for the same roster cost one search.
+    """
+
+    def __init__(
+        self, links: Iterable[MonsterBreedingLink], monsters: Iterable[MonsterDetail]
+    ):
+        self.monsters: Dict[int, MonsterDetail] = {
+            monster.id: monster for monster in monsters if monster.id is not None
+        }
+        self.family_members: Dict[int, List[int]] = defaultdict(list)
+        for monster_id, monster in self.monsters.items():
+            self.family_members[monster.family_id].append(monster_id)
+
+        self.combos: List[Tuple[int, int, Slot, Slot]] = [
+            (
+                link.id,
+                link.child_id,
+                (link.pedigree_id, link.pedigree_family_id),
+                (link.parent2_id, link.family2_id),
+            )
+            for link in sorted(links, key=lambda link: link.id or 0)
+            if link.id is not None and link.child_id is not None
+        ]
+        self._search = lru_cache(maxsize=256)(self._search_uncached)
+
+    @classmethod
+    def load(cls, session: Session) -> "BreedingPlanner":
+        return cls(
+            session.exec(select(MonsterBreedingLink)).all(),
+            session.exec(select(MonsterDetail)).all(),
+        )
+
+    def _fill_slot(
+        self, slot: Slot, depth: Dict[int, PlanStep]
+    ) -> Optional[Tuple[int, int]]:
+        """
+        cheapest (monster_id, breedings) that fits slot at the given depth
+        """
+        monster_id, family_id = slot
+        if monster_id is not None:
+            candidates = [monster_id]
+        elif family_id is not None:
+            candidates = self.family_members.get(family_id, [])
+        else:
+            candidates = []
+        best = None
+        for candidate in candidates:
+            step = depth.get(candidate)
+            if step is not None and (best is None or step.breedings < best[1]):
+                best = (candidate, step.breedings)
+        return best
+
+    def _search_uncached(
+        self, roster: FrozenSet[int], max_depth: int
+    ) -> List[Dict[int, PlanStep]]:
+        depths = [{monster_id: PlanStep(0) for monster_id in roster}]
+        for _ in range(max_depth):
+            previous = depths[-1]
+            current = dict(depths[0])
+            for combo_id, child_id, pedigree_slot, parent2_slot in self.combos:
+                if child_id in roster:
+                    continue
+                pedigree = self._fill_slot(pedigree_slot, previous)
+                parent2 = self._fill_slot(parent2_slot, previous)
+                if pedigree is None or parent2 is None:
+                    continue
+                breedings = 1 + pedigree[1] + parent2[1]
+                best = current.get(child_id)
+                if best is None or breedings < best.breedings:
+                    current[child_id] = PlanStep(
+                        breedings, combo_id, pedigree[0], parent2[0]
+                    )
+            if current == previous:
+                # nothing new at this depth, deeper searches would repeat it
+                break
+            depths.append(current)
+        return depths
+
+    def plan(
+        self, target_id: int, roster: Iterable[int], max_depth: int
+    ) -> Optional[BreedingPlan]:
+        """
+        cheapest breeding tree for target_id at most max_depth generations
+        deep, or None if the roster cannot reach it
+        """
+        depths = self._search(frozenset(roster), max_depth)
+        if target_id not in depths[-1]:
+            return None
+        tree = self._build_tree(target_id, depths, len(depths) - 1)
+        return BreedingPlan(
+            target_id=target_id,
+            roster=sorted(set(roster)),
+            breedings=depths[-1][target_id].breedings,
+            generations=_generations(tree),
+            plan=tree,
+        )
+
+    def _build_tree(
+        self, monster_id: int, depths: List[Dict[int, PlanStep]], depth: int
+    ) -> BreedingPlanNode:
+        step = depths[depth][monster_id]
+        monster = self.monsters.get(monster_id)
+        node = BreedingPlanNode(
+            monster_id=monster_id,
+            new_name=monster.new_name if monster else None,
+            old_name=monster.old_name if monster else None,
+            combo_id=step.combo_id,
+        )
+        if step.pedigree_id is not None and step.parent2_id is not None:
+            node.pedigree = self._build_tree(step.pedigree_id, depths, depth - 1)
+            node.parent2 = self._build_tree(step.parent2_id, depths, depth - 1)
+        return node
+
+
+class BreedingReachability:
+    """
+    Which monsters a roster can breed, any number of generations deep.
+
+    Monsters are bits of an int (by id order). Each combination becomes a
+    rule (pedigree mask, parent2 mask, child bit) where a family slot's mask
+    holds every monster of the family, and rules with the same parent masks
+    are merged. A roster's closure applies every rule whose two masks
+    intersect the reachable set until nothing changes, so each rule costs
+    two ANDs per pass. Closures are memoized per roster.
+    """
+
+    def __init__(
+        self, links: Iterable[MonsterBreedingLink], monsters: Iterable[MonsterDetail]
+    ):
+        self.monster_ids: List[int] = sorted(
+            monster.id for monster in monsters if monster.id is not None
+        )
+        self.bits: Dict[int, int] = {
+            monster_id: 1 << index for index, monster_id in enumerate(self.monster_ids)
+        }
+        self.family_masks: Dict[int, int] = defaultdict(int)
+        for monster in monsters:
+            if monster.id is not None:
+                self.family_masks[monster.family_id] |= self.bits[monster.id]
+
+        rules: Dict[Tuple[int, int], int] = defaultdict(int)
+        for link in links:
+            if link.child_id is None:
+                continue
+            child = self.bits.get(link.child_id, 0)
+            pedigree = self._slot_mask((link.pedigree_id, link.pedigree_family_id))
+            parent2 = self._slot_mask((link.parent2_id, link.family2_id))
+            if child and pedigree and parent2:
+                rules[pedigree, parent2] |= child
+        self.rules: List[Tuple[int, int, int]] = [
+            (pedigree, parent2, children)
+            for (pedigree, parent2), children in sorted(rules.items())
+        ]
+        self._closure = lru_cache(maxsize=256)(self._closure_uncached)
+
+    @classmethod
+    def load(cls, session: Session) -> "BreedingReachability":
+        return cls(
+            session.exec(select(MonsterBreedingLink)).all(),
+            session.exec(select(MonsterDetail)).all(),
+        )
+
+    def _slot_mask(self, slot: Slot) -> int:
+        monster_id, family_id = slot
+        if monster_id is not None:
+            return self.bits.get(monster_id, 0)
+        if family_id is not None:
+            return self.family_masks.get(family_id, 0)
+        return 0
+
+    def _closure_uncached(self, roster_mask: int) -> int:
+        reachable = roster_mask
+        pending = self.rules
+        while True:
+            remaining = []
+            for rule in pending:
+                pedigree, parent2, children = rule
+                if not children & ~reachable:
+                    continue
+                if reachable & pedigree and reachable & parent2:
+                    reachable |= children
+                else:
+                    remaining.append(rule)
+            if len(remaining) == len(pending):
+                return reachable
+            pending = remaining
+
+    def reachable(self, roster: Iterable[int]) -> List[int]:
+        """
+        ids of the roster monsters and every monster they can breed
+        """
+        roster_mask = 0
+        for monster_id in roster:
+            roster_mask |= self.bits[monster_id]
+        reachable = self._closure(roster_mask)
+        return [
+            monster_id
+            for monster_id in self.monster_ids
+            if reachable & self.bits[monster_id]
+        ]
+
+
+def _generations(node: Optional[BreedingPlanNode]) -> int:
+    if node is None or node.combo_id is None:
+        return 0
+    return 1 + max(_generations(node.pedigree), _generations(node.parent2))
@@ -0,0 +1,171 @@
+"""
+Content-Encoding negotiation and compression of the JSON responses.
+
+gzip is always available. brotli is an optional dependency and preferred
+when installed and accepted by the client. Bodies are compressed
+deterministically (no gzip timestamp), so a given body and encoding always
+give the same bytes and strong ETags stay valid.
+"""
+
+import gzip
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+Headers = List[Tuple[bytes, bytes]]
+
+# bodies smaller than this are sent as they are
+MINIMUM_SIZE = 500
+COMPRESSIBLE_TYPES = (b"application/json", b"text/")
+
+
+def available_encodings() -> List[str]:
+    """
+    supported content codings, most preferred first
+    """
+    if brotli is not None:
+        return ["br", "gzip"]
+    return ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: str, encodings: Sequence[str]) -> Optional[str]:
+    """
+    the coding from encodings with the highest q value in the Accept-Encoding
+    header, ties going to the first in encodings. None means identity.
+    """
+    qualities = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, best: bool = False) -> bytes:
+    """
+    best trades speed for size, for bodies compressed once and stored
+    """
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=9 if best else 6, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(body, quality=11 if best else 5)
+    raise ValueError(f"unsupported content encoding {encoding!r}")
+
+
+def get_header(headers: Headers, name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def is_compressible(headers: Headers) -> bool:
+    """
+    a text or JSON body that is not already encoded
+    """
+    content_type = get_header(headers, b"content-type") or b""
+    return content_type.startswith(COMPRESSIBLE_TYPES) and (
+        get_header(headers, b"content-encoding") is None
+    )
+
+
+def encoded_headers(headers: Headers, body: bytes, encoding: Optional[str]) -> Headers:
+    """
+    headers for sending body with the given content coding: the length
+    replaced, Content-Encoding set and Vary: Accept-Encoding added once
+    """
+    headers = [
+        (key, value)
+        for key, value in headers
+        if key.lower() not in (b"content-length", b"content-encoding")
+    ]
+    headers.append((b"content-length", str(len(body)).encode()))
+    if encoding is not None:
+        headers.append((b"content-encoding", encoding.encode()))
+    vary = get_header(headers, b"vary")
+    if vary is None:
+        headers.append((b"vary", b"Accept-Encoding"))
+    elif b"accept-encoding" not in vary.lower():
+        headers = [(key, value) for key, value in headers if key.lower() != b"vary"]
+        headers.append((b"vary", vary + b", Accept-Encoding"))
+    return headers
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing text and JSON responses under path_prefix
+    with the best coding the client accepts. Responses that already carry a
+    Content-Encoding (precompressed by the response cache) pass through.
+    """
+
+    def __init__(
+        self,
+        app,
+        encodings: Sequence[str],
+        minimum_size: int = MINIMUM_SIZE,
+        path_prefix: str = "/dqm1/",
+    ):
+        self.app = app
+        self.encodings = list(encodings)
+        self.minimum_size = minimum_size
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not self.encodings
+            or not scope["path"].startswith(self.path_prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = get_header(scope["headers"], b"accept-encoding") or b""
+        encoding = negotiate_encoding(accept_encoding.decode(), self.encodings)
+        start_message = {}
+        body_parts = []
+
+        async def send_compressed(message):
+            if message["type"] == "http.response.start":
+                if not is_compressible(message.get("headers", [])):
+                    await send(message)
+                    return
+                start_message.update(message)
+                return
+            if message["type"] != "http.response.body" or not start_message:
+                await send(message)
+                return
+
+            body_parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(body_parts)
+            body_encoding = None
+            if encoding is not None and len(body) >= self.minimum_size:
+                compressed = compress(body, encoding)
+                if len(compressed) < len(body):
+                    body, body_encoding = compressed, encoding
+            start_message["headers"] = encoded_headers(
+                list(start_message.get("headers", [])), body, body_encoding
+            )
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,140 @@
+"""
+HTTP conditional requests for the read-only /dqm1/* routes.
+
+Every response is a function of the request URL, the negotiated content
+coding and the dataset, so an ETag can be derived from those alone, and a
+matching If-None-Match answered with 304 before the route (or the database)
+runs.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Iterable, Optional, Sequence, Union
+
+from src.app.compression import get_header, negotiate_encoding
+from src.app.response_cache import cache_key
+
+
+def dataset_version(paths: Iterable[Union[str, Path]], app_version: str = "") -> str:
+    """
+    fingerprint of the files the database is built from and of the app
+    version, which changes with the shape of the responses. It changes
+    whenever any of them does.
+    """
+    digest = hashlib.sha256(app_version.encode())
+    for path in sorted(Path(path) for path in paths):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def make_etag(
+    version: str, path: str, query_string: bytes, encoding: Optional[str] = None
+) -> str:
+    """
+    strong ETag for one URL and content coding. Query parameters are
+    normalized as for the response cache, so ?a=1&b=2 and ?b=2&a=1 share a
+    tag.
+    """
+    url_path, query = cache_key(path, query_string)
+    url_hash = hashlib.sha256(f"{url_path}?{query}".encode()).hexdigest()[:16]
+    if encoding is None:
+        return f'"{version}-{url_hash}"'
+    return f'"{version}-{url_hash}-{encoding}"'
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    """
+    If-None-Match uses the weak comparison, so a W/ prefix is ignored.
+    "*" is not a tag, it asks whether the URL has any representation.
+    """
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class ConditionalRequestMiddleware:
+    """
+    ASGI middleware adding ETag and Cache-Control headers to 200 GET/HEAD
+    responses under path_prefix, and answering a matching If-None-Match with
+    304 Not Modified without calling the app.
+
+    If-None-Match: * matches any representation, so whether the URL has one
+    is only known from the app's response: a 200 is turned into a 304 and
+    anything else (e.g. a 404) is sent as it is.
+
+    encodings are the content codings CompressionMiddleware may apply, so
+    each compressed variant gets its own tag.
+    """
+
+    def __init__(
+        self,
+        app,
+        version: str,
+        max_age: int = 0,
+        encodings: Sequence[str] = (),
+        path_prefix: str = "/dqm1/",
+    ):
+        self.app = app
+        self.version = version
+        self.cache_control = f"public, max-age={max_age}".encode()
+        self.encodings = list(encodings)
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("GET", "HEAD")
+            or not scope["path"].startswith(self.path_prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = get_header(scope["headers"], b"accept-encoding") or b""
+        encoding = negotiate_encoding(accept_encoding.decode(), self.encodings)
+        etag = make_etag(self.version, scope["path"], scope["query_string"], encoding)
+        validator_headers = [
+            (b"etag", etag.encode()),
+            (b"cache-control", self.cache_control),
+        ]
+        # the tag depends on the content coding, so a 304 carries the Vary
+        # that CompressionMiddleware gives the 200
+        not_modified_headers = list(validator_headers)
+        if self.encodings:
+            not_modified_headers.append((b"vary", b"Accept-Encoding"))
+
+        match_any = False
+        for name, value in scope["headers"]:
+            if name != b"if-none-match":
+                continue
+            if value.strip() == b"*":
+                match_any = True
+            elif etag_matches(etag, value.decode()):
+                await send(_not_modified_start(not_modified_headers))
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        not_modified = False
+
+        async def send_with_etag(message):
+            nonlocal not_modified
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                if match_any:
+                    not_modified = True
+                    await send(_not_modified_start(not_modified_headers))
+                    return
+                message = dict(message)
+                message["headers"] = (
+                    list(message.get("headers", [])) + validator_headers
+                )
+            elif message["type"] == "http.response.body" and not_modified:
+                # the 304 has no body, send an empty one in place of the last
+                if not message.get("more_body", False):
+                    await send({"type": "http.response.body", "body": b""})
+                return
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
+
+
+def _not_modified_start(headers):
+    return {"type": "http.response.start", "status": 304, "headers": headers}
@@ -1,12 +1,19 @@
+import argparse
 import csv
+import os
+from dataclasses import replace
 from pathlib import Path
+from typing import Any, Dict, Iterable, List
 
-from sqlmodel import Session, select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import aliased
+from sqlmodel import SQLModel, and_, col, delete, func, or_, select, text
 
-from src.app.database import create_db_and_tables, engine
+from src.app.database import create_db_engine, engine, sqlite_file_name
 from src.app.models import (
     Item,
+    MonsterBreedingExpansion,
     MonsterBreedingLink,
     MonsterDetail,
     MonsterFamily,
@@ -14,79 +21,200 @@ from src.app.models import (
     Skill,
     SkillCombine,
 )
+from src.app.settings import settings
 
 current_dir = Path(__file__).resolve().parent
 csv_dir = current_dir.parent / "csv_files"
 
-
-def _insert_data(csv_file, Model):
+# csv file for each table, in the order they are loaded
+CSV_TABLES = [
+    (csv_dir / "DQM1_items.csv", Item),
+    (csv_dir / "DQM1_monster_family.csv", MonsterFamily),
+    (csv_dir / "DQM1_skills.csv", Skill),
+    (csv_dir / "DQM1_skill_combo.csv", SkillCombine),
+    (csv_dir / "DQM1_monsterdetails.csv", MonsterDetail),
+    (csv_dir / "DQM1_breeding_combo.csv", MonsterBreedingLink),
+    (csv_dir / "DQM1_monster_skill_link.csv", MonsterSkillLink),
+]
+
+# per-connection settings while loading. The database is rebuilt from the csv
+# files if a load fails, so there is no need for a rollback journal or fsync.
+LOAD_PRAGMAS = {
+    "journal_mode": "OFF",
+    "synchronous": "OFF",
+    "temp_store": "MEMORY",
+    "cache_size": "-64000",  # 64MB
+}
+
+
+def _read_csv_rows(csv_file, Model) -> List[Dict[str, Any]]:
     """
-    helper function that uses dictionary unpacking to add csv file data
-    into database
+    helper function that reads csv file rows as dictionaries keyed by the
+    table's column names (csv headers such as ID are lowercased)
     """
-    with Session(engine) as session:
-        with open(csv_file, encoding="utf-8-sig") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # replace empty string with None
-                row = {k: (None if v == "" else v) for k, v in row.items()}
-                if "id" in row:
-                    existing_entry = session.exec(
-                        select(Model).where(Model.id == row["id"])
-                    ).first()
-
-                    if existing_entry:
-                        print(
-                            f"Entry with id {row['id']} already exists. Skipping insertion."
-                        )
-                        continue
-                try:
-                    session.add(Model(**row))
-                except IntegrityError as e:
-                    session.rollback()
-                    print(f"IntegrityError has occurred: {e.orig}")
-
-        session.commit()
-
-
-def create_item_csv():
-    _insert_data(csv_dir / "DQM1_items.csv", Item)
-
-
-def create_monster_family_csv():
-    _insert_data(csv_dir / "DQM1_monster_family.csv", MonsterFamily)
+    columns = set(Model.__table__.columns.keys())
+    with open(csv_file, encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        rows = []
+        for row in reader:
+            # replace empty string with None
+            row = {k.lower(): (None if v == "" else v) for k, v in row.items()}
+            rows.append({k: v for k, v in row.items() if k in columns})
+    return rows
+
+
+def _bulk_insert(connection: Connection, csv_file, Model):
+    """
+    inserts every csv row with one executemany statement. Rows whose id is
+    already in the table are skipped.
+    """
+    rows = _read_csv_rows(csv_file, Model)
+    if rows:
+        connection.execute(insert(Model.__table__).on_conflict_do_nothing(), rows)
 
 
-def create_skill_csv():
-    _insert_data(csv_dir / "DQM1_skills.csv", Skill)
+def _get_pragmas(connection: Connection, names: Iterable[str]) -> Dict[str, str]:
+    return {
+        name: str(connection.execute(text(f"PRAGMA {name}")).scalar()) for name in names
+    }
 
 
-def create_skillcombo_csv():
-    _insert_data(csv_dir / "DQM1_skill_combo.csv", SkillCombine)
+def _set_pragmas(connection: Connection, pragmas: Dict[str, str]):
+    for name, value in pragmas.items():
+        connection.execute(text(f"PRAGMA {name} = {value}"))
 
 
-def create_monster_detail_csv():
-    _insert_data(csv_dir / "DQM1_monsterdetails.csv", MonsterDetail)
+def _expand_family_breeding(connection: Connection):
+    """
+    fills MonsterBreedingExpansion with every concrete (pedigree, parent2)
+    pair of the links with a family-wide parent, replacing any rows it has
+    """
+    link = MonsterBreedingLink
+    pedigree = aliased(MonsterDetail, name="pedigree")
+    parent2 = aliased(MonsterDetail, name="parent2")
+    pedigree_id = func.coalesce(col(link.pedigree_id), col(pedigree.id))
+    parent2_id = func.coalesce(col(link.parent2_id), col(parent2.id))
+    pairs = (
+        select(col(link.id), col(link.child_id), pedigree_id, parent2_id)
+        .select_from(link)
+        .outerjoin(
+            pedigree,
+            and_(
+                col(link.pedigree_id).is_(None),
+                col(pedigree.family_id) == link.pedigree_family_id,
+            ),
+        )
+        .outerjoin(
+            parent2,
+            and_(
+                col(link.parent2_id).is_(None),
+                col(parent2.family_id) == link.family2_id,
+            ),
+        )
+        .where(or_(col(link.pedigree_id).is_(None), col(link.parent2_id).is_(None)))
+        .where(pedigree_id.is_not(None), parent2_id.is_not(None))
+        .order_by(col(link.id), pedigree_id, parent2_id)
+    )
+    connection.execute(delete(MonsterBreedingExpansion))
+    connection.execute(
+        insert(MonsterBreedingExpansion).from_select(
+            ["link_id", "child_id", "pedigree_id", "parent2_id"], pairs
+        )
+    )
+
+
+def expand_family_breeding(db_engine: Engine = engine):
+    """
+    (re)builds the family-wide breeding expansion of an existing database,
+    creating its table if the database predates it
+    """
+    SQLModel.metadata.create_all(db_engine)
+    with db_engine.begin() as connection:
+        _expand_family_breeding(connection)
 
 
-def create_breed_combo():
-    _insert_data(csv_dir / "DQM1_breeding_combo.csv", MonsterBreedingLink)
+def add_missing_indexes(db_engine: Engine = engine):
+    """
+    creates every index declared in models.py that the database does not
+    have yet. create_all() only adds indexes while creating a new table, so
+    this is how an existing database.db gets the indexes.
+    ANALYZE afterwards lets sqlite's query planner use them well.
+    """
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db_engine, checkfirst=True)
+    with db_engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
 
 
-def create_monster_skill_link():
-    _insert_data(csv_dir / "DQM1_monster_skill_link.csv", MonsterSkillLink)
+def load_all_csv_data(db_engine: Engine = engine):
+    """
+    creates the tables and loads every csv file in a single transaction,
+    then expands the family-wide breeding combinations. The connection's
+    PRAGMAs (e.g. a WAL journal_mode) are put back once the load is done.
+    """
+    SQLModel.metadata.create_all(db_engine)
+    with db_engine.connect() as connection:
+        previous_pragmas = _get_pragmas(connection, LOAD_PRAGMAS)
+        _set_pragmas(connection, LOAD_PRAGMAS)
+        for csv_file, Model in CSV_TABLES:
+            _bulk_insert(connection, csv_file, Model)
+        _expand_family_breeding(connection)
+        connection.commit()
+        _set_pragmas(connection, previous_pragmas)
+        connection.commit()
+    add_missing_indexes(db_engine)
+
+
+def bake_database(db_path: Path = sqlite_file_name):
+    """
+    builds a fresh, compacted database file for the app to open read-only
+    (DQM_DB_READONLY=1). It is built next to db_path and moved over it once
+    it is complete, so a failed build never leaves a half-loaded file behind.
+    """
+    db_path = Path(db_path)
+    build_path = db_path.with_name(db_path.name + ".build")
+    build_path.unlink(missing_ok=True)
 
+    build_settings = replace(
+        settings, db_readonly=False, db_echo=False, db_pool="null", db_mmap_size=0
+    )
+    build_engine = create_db_engine(build_path, build_settings)
+    load_all_csv_data(build_engine)
+    with build_engine.connect() as connection:
+        # VACUUM cannot run inside a transaction
+        connection.execution_options(isolation_level="AUTOCOMMIT")
+        connection.execute(text("VACUUM"))
+        connection.execute(text("PRAGMA optimize"))
+    build_engine.dispose()
 
-def load_all_csv_data():
-    create_db_and_tables()
-    create_item_csv()
-    create_monster_family_csv()
-    create_skill_csv()
-    create_skillcombo_csv()
-    create_monster_detail_csv()
-    create_breed_combo()
-    create_monster_skill_link()
+    os.replace(build_path, db_path)
 
 
 if __name__ == "__main__":
-    load_all_csv_data()
+    parser = argparse.ArgumentParser(description="Build database.db from csv files")
+    parser.add_argument(
+        "--add-indexes",
+        action="store_true",
+        help="only add missing indexes to an existing database.db",
+    )
+    parser.add_argument(
+        "--expand-families",
+        action="store_true",
+        help="only rebuild the family breeding expansion of an existing database.db",
+    )
+    parser.add_argument(
+        "--bake",
+        action="store_true",
+        help="build a new, compacted database.db for read-only serving",
+    )
+    args = parser.parse_args()
+
+    if args.bake:
+        bake_database()
+    elif args.add_indexes:
+        add_missing_indexes()
+    elif args.expand_families:
+        expand_family_breeding()
+    else:
+        load_all_csv_data()
@@ -1,14 +1,83 @@
 from pathlib import Path
+from typing import Any, Dict, Union
 
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool, QueuePool, SingletonThreadPool, StaticPool
 from sqlmodel import SQLModel, create_engine
 
+from src.app.settings import Settings, settings
+
 app_dir = Path(__file__).resolve().parent
 project_dir = app_dir.parent
 
 sqlite_file_name = project_dir / "database.db"
 sqlite_url = f"sqlite:///{sqlite_file_name}"
 
-engine = create_engine(sqlite_url, echo=True)
+POOL_CLASSES = {
+    "queue": QueuePool,
+    "singleton": SingletonThreadPool,
+    "static": StaticPool,
+    "null": NullPool,
+}
+
+
+def _pool_kwargs(db_settings: Settings) -> Dict[str, Any]:
+    if db_settings.db_pool not in POOL_CLASSES:
+        raise ValueError(
+            f"DQM_DB_POOL must be one of {', '.join(POOL_CLASSES)}, "
+            f"not {db_settings.db_pool!r}"
+        )
+    kwargs: Dict[str, Any] = {"poolclass": POOL_CLASSES[db_settings.db_pool]}
+    pool_size = db_settings.db_pool_size or db_settings.threadpool_size
+    if db_settings.db_pool == "queue":
+        # one connection per threadpool worker. A smaller pool can deadlock:
+        # workers wait on a connection while the requests holding one wait
+        # on a worker.
+        kwargs.update(pool_size=pool_size, max_overflow=0)
+    elif db_settings.db_pool == "singleton":
+        kwargs.update(pool_size=pool_size)
+    return kwargs
+
+
+def create_db_engine(
+    db_path: Union[str, Path] = sqlite_file_name, db_settings: Settings = settings
+) -> Engine:
+    """
+    Engine for the sqlite file at db_path, configured from db_settings.
+
+    db_readonly opens the file with mode=ro&immutable=1. sqlite then skips
+    all locking and change detection, so the file must never be written while
+    the app runs (build it with create_database.py --bake).
+    db_settings.db_pragmas are applied to every new connection, e.g.
+    mmap_size so every uvicorn worker shares the OS page cache.
+    """
+    if db_settings.db_readonly:
+        url = f"sqlite:///file:{db_path}?mode=ro&immutable=1&uri=true"
+    else:
+        url = f"sqlite:///{db_path}"
+
+    db_engine = create_engine(
+        url,
+        echo=db_settings.db_echo,
+        connect_args={"check_same_thread": db_settings.db_check_same_thread},
+        **_pool_kwargs(db_settings),
+    )
+
+    pragmas = db_settings.db_pragmas
+    if pragmas:
+
+        @event.listens_for(db_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+            cursor.close()
+
+    return db_engine
+
+
+engine = create_db_engine()
 
 
 def create_db_and_tables():
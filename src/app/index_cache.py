@@ -0,0 +1,39 @@
+"""
+Per-database cache of precomputed, read-only indexes.
+
+Indexes are keyed by the engine behind the session, so each database (e.g. a
+test database) gets its own copy, built the first time it is asked for.
+"""
+
+import threading
+from typing import Any, Dict, Protocol, Type, TypeVar, Union
+from weakref import WeakKeyDictionary
+
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import Session
+
+
+class DatasetIndex(Protocol):
+    @classmethod
+    def load(cls, session: Session) -> Any: ...
+
+
+IndexT = TypeVar("IndexT", bound=DatasetIndex)
+
+_indexes: "WeakKeyDictionary[Union[Engine, Connection], Dict[type, Any]]" = (
+    WeakKeyDictionary()
+)
+_lock = threading.Lock()
+
+
+def get_or_build(session: Session, index_cls: Type[IndexT]) -> IndexT:
+    """
+    returns the index_cls instance for the database behind session, calling
+    index_cls.load(session) the first time
+    """
+    engine = session.get_bind()
+    with _lock:
+        indexes = _indexes.setdefault(engine, {})
+        if index_cls not in indexes:
+            indexes[index_cls] = index_cls.load(session)
+        return indexes[index_cls]
@@ -1,11 +1,21 @@
-from typing import List, Optional
+from contextlib import asynccontextmanager
+from typing import Any, List, Optional, Sequence
 
-from fastapi import Depends, FastAPI, HTTPException
+from anyio import to_thread
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from sqlmodel import Session, select
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, lazyload, selectinload
+from sqlmodel import Session, col, select
 
+from src.app import index_cache
+from src.app.breeding import BreedingIndex, BreedingPlanner, BreedingReachability
+from src.app.compression import CompressionMiddleware, available_encodings
+from src.app.conditional import ConditionalRequestMiddleware, dataset_version
+from src.app.create_database import CSV_TABLES
 from src.app.database import engine
+from src.app.json_response import JSONResponseClass
 from src.app.model_enums import (
     ItemCategory,
     ItemSellLocation,
@@ -13,18 +23,55 @@ from src.app.model_enums import (
     SkillFamily,
 )
 from src.app.models import (
+    BreedingPlan,
+    BreedingReachable,
     Item,
-    MonsterBreedingLink,
+    LearnableSkills,
+    MissingSprite,
     MonsterBreedingLinkReadWithInfo,
     MonsterDetail,
     MonsterDetailSkill,
     MonsterDetailWithFamily,
     MonsterFamily,
     MonsterFamilyReadWithMonsterDetail,
+    NameMatch,
+    SearchResult,
     Skill,
     SkillCombine,
     SkillCombineRead,
+    SkillRead,
     SkillUpgradeRead,
+    SpriteAtlas,
+    StatProfile,
+)
+from src.app.pagination import (
+    MAX_BATCH_IDS,
+    MISSING_IDS_HEADER,
+    NEXT_CURSOR_HEADER,
+    fetch_rows,
+    finish_page,
+    keyset_query,
+    keyset_slice,
+    order_by_request,
+    parse_fields,
+)
+from src.app.response_cache import ResponseCache, ResponseCacheMiddleware, warm_up
+from src.app.search import (
+    AUTOCOMPLETE_KINDS,
+    KINDS,
+    AutocompleteIndex,
+    SearchIndex,
+)
+from src.app.settings import settings
+from src.app.skills import SkillGraph, SkillRequirements
+from src.app.snapshot import Snapshot
+from src.app.sprites import (
+    SPRITE_DIR,
+    MonsterSpriteIndex,
+    Sprite,
+    SpriteFiles,
+    atlas_monster_ids,
+    sprite_store,
 )
 
 tags_metadata = [
@@ -40,17 +87,134 @@ tags_metadata = [
         "name": "dqm1 items",
         "description": "Useful items found in the game and their description",
     },
+    {
+        "name": "dqm1 search",
+        "description": "Typo tolerant search over monsters, skills and items, "
+        "and name autocompletion",
+    },
 ]
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # routes are sync so their blocking sqlite calls run in anyio's threadpool
+    # instead of on the event loop. This bounds how many run at once.
+    to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+    with Session(engine) as session:
+        if settings.snapshot_mode:
+            app.state.snapshot = Snapshot.load(session)
+        else:
+            index_cache.get_or_build(session, BreedingIndex)
+            index_cache.get_or_build(session, BreedingPlanner)
+            index_cache.get_or_build(session, BreedingReachability)
+            index_cache.get_or_build(session, MonsterSpriteIndex)
+            index_cache.get_or_build(session, SearchIndex)
+            index_cache.get_or_build(session, AutocompleteIndex)
+            index_cache.get_or_build(session, SkillGraph)
+            index_cache.get_or_build(session, SkillRequirements)
+        warm_up_paths = (
+            response_cache_paths(session) if response_cache is not None else []
+        )
+    if warm_up_paths and response_cache is not None:
+        await warm_up(app, warm_up_paths)
+        response_cache.reset_stats()
+    yield
+
+
+def response_cache_paths(session: Session) -> List[str]:
+    """
+    the list routes and every detail page, requested at startup to fill the
+    response cache
+    """
+    paths = [
+        "/dqm1/monsters",
+        "/dqm1/skills",
+        "/dqm1/items",
+        "/dqm1/sprites/atlas",
+        "/dqm1/sprites/missing",
+    ]
+    for monster_id in session.exec(select(MonsterDetail.id)):
+        paths.append(f"/dqm1/monsters/{monster_id}")
+        paths.append(f"/dqm1/monstersandskill/{monster_id}")
+        paths.append(f"/dqm1/breeding/{monster_id}")
+    for family_id in session.exec(select(MonsterFamily.id)):
+        paths.append(f"/dqm1/family/{family_id}")
+    for skill_id in session.exec(select(Skill.id)):
+        paths.append(f"/dqm1/skills/{skill_id}")
+    combo_skill_ids = select(SkillCombine.combo_skill_id).distinct()
+    for skill_id in session.exec(combo_skill_ids):
+        paths.append(f"/dqm1/skillcombine/{skill_id}")
+    for item_id in session.exec(select(Item.id)):
+        paths.append(f"/dqm1/items/{item_id}")
+    return paths
+
+
 app = FastAPI(
     title="Dragon Quest Monsters Database API",
     description="API to get game information for the original DQMonsters "
     "gameboy game",
     version="1.0.0",
     openapi_tags=tags_metadata,
+    lifespan=lifespan,
+    default_response_class=JSONResponseClass,
 )
 app.mount("/static", StaticFiles(directory="src/static"), name="static")
 
+
+def build_atlas_image(name: str) -> Optional[Sprite]:
+    """
+    rebuilds an atlas image requested from a worker process that has not
+    built it yet
+    """
+    try:
+        monster_ids = atlas_monster_ids(name)
+    except ValueError:
+        return None
+    snapshot = getattr(app.state, "snapshot", None)
+    if snapshot is not None:
+        snapshot.sprite_index.atlas(monster_ids)
+    else:
+        with Session(engine) as session:
+            index_cache.get_or_build(session, MonsterSpriteIndex).atlas(monster_ids)
+    return sprite_store.get(name)
+
+
+# monster sprites (and atlases of them) from memory at content-hashed,
+# immutable URLs
+app.mount("/sprites", SpriteFiles(sprite_store, build_atlas_image), name="sprites")
+
+# Middleware added first runs innermost. Requests pass through CORS, then
+# conditional requests, compression and the response cache. CORS headers are
+# computed per request rather than stored.
+encodings = available_encodings() if settings.compression else []
+
+# rendered /dqm1/* responses and their compressed variants, None when the
+# cache is off
+response_cache: Optional[ResponseCache] = None
+if settings.response_cache:
+    response_cache = ResponseCache(
+        max_entries=settings.response_cache_max_entries,
+        max_bytes=settings.response_cache_max_bytes,
+    )
+    app.add_middleware(
+        ResponseCacheMiddleware, cache=response_cache, encodings=encodings
+    )
+
+app.add_middleware(CompressionMiddleware, encodings=encodings)
+
+# ETags derive from the csv files database.db is built from and the sprites,
+# and a matching
+# If-None-Match is answered before the response cache or any route runs
+app.add_middleware(
+    ConditionalRequestMiddleware,
+    version=dataset_version(
+        [*(csv_file for csv_file, _ in CSV_TABLES), *SPRITE_DIR.glob("*.png")],
+        app.version,
+    ),
+    max_age=settings.http_max_age,
+    encodings=encodings,
+)
+
 origins = [
     "http://localhost",
     "http://localhost:8080",
@@ -61,16 +225,161 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
-    allow_methods=["GET"],
+    allow_methods=["GET", "POST"],
     allow_headers=["*"],
+    # let browser clients read the pagination headers
+    expose_headers=[NEXT_CURSOR_HEADER, MISSING_IDS_HEADER],
 )
 
 
-async def get_session():  # place in database.py?
+# eager loading for each response model, so serializing a response never lazy
+# loads a relationship once per row (N+1 queries)
+MONSTER_WITH_FAMILY = [joinedload(MonsterDetail.family)]  # type: ignore[arg-type]
+MONSTER_WITH_FAMILY_AND_SKILLS = [
+    joinedload(MonsterDetail.family),  # type: ignore[arg-type]
+    selectinload(MonsterDetail.skills),  # type: ignore[arg-type]
+]
+FAMILY_WITH_MONSTERS = [selectinload(MonsterFamily.monsters)]  # type: ignore[arg-type]
+SKILL_WITH_UPGRADES = [
+    joinedload(Skill.upgrade_to).lazyload("*"),  # type: ignore[arg-type]
+    joinedload(Skill.upgrade_from).lazyload("*"),  # type: ignore[arg-type]
+]
+# SkillCombineRead only has needed_skill, skip joining combo_skill
+SKILL_COMBINE_WITH_NEEDED_SKILL = [
+    joinedload(SkillCombine.needed_skill).lazyload("*"),  # type: ignore[arg-type]
+    lazyload(SkillCombine.combo_skill),  # type: ignore[arg-type]
+]
+
+
+def get_session():  # place in database.py?
+    """
+    sync dependency, so FastAPI opens and closes the session in its
+    threadpool alongside the (sync) route that uses it
+    """
     with Session(engine) as session:
         yield session
 
 
+def get_snapshot(request: Request) -> Optional[Snapshot]:
+    """
+    in-memory dataset loaded at startup when snapshot mode is on, else None
+    """
+    return getattr(request.app.state, "snapshot", None)
+
+
+def get_breeding_index(
+    session: Session = Depends(get_session),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
+) -> BreedingIndex:
+    if snapshot is not None:
+        return snapshot.breeding_index
+    return index_cache.get_or_build(session, BreedingIndex)
+
+
+def get_breeding_planner(
+    session: Session = Depends(get_session),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
+) -> BreedingPlanner:
+    if snapshot is not None:
+        return snapshot.breeding_planner
+    return index_cache.get_or_build(session, BreedingPlanner)
+
+
+def get_breeding_reachability(
+    session: Session = Depends(get_session),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
+) -> BreedingReachability:
+    if snapshot is not None:
+        return snapshot.breeding_reachability
+    return index_cache.get_or_build(session, BreedingReachability)
+
+
+def get_sprite_index(
+    session: Session = Depends(get_session),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
+) -> MonsterSpriteIndex:
+    if snapshot is not None:
+        return snapshot.sprite_index
+    return index_cache.get_or_build(session, MonsterSpriteIndex)
+
+
+def get_search_index(
+    session: Session = Depends(get_session),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
+) -> SearchIndex:
+    if snapshot is not None:
+        return snapshot.search_index
+    return index_cache.get_or_build(session, SearchIndex)
+
+
+def get_autocomplete_index(
+    session: Session = Depends(get_session),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
+) -> AutocompleteIndex:
+    if snapshot is not None:
+        return snapshot.autocomplete_index
+    return index_cache.get_or_build(session, AutocompleteIndex)
+
+
+def get_skill_graph(
+    session: Session = Depends(get_session),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
+) -> SkillGraph:
+    if snapshot is not None:
+        return snapshot.skill_graph
+    return index_cache.get_or_build(session, SkillGraph)
+
+
+def get_skill_requirements(
+    session: Session = Depends(get_session),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
+) -> SkillRequirements:
+    if snapshot is not None:
+        return snapshot.skill_requirements
+    return index_cache.get_or_build(session, SkillRequirements)
+
+
+def parse_id_list(value: str, name: str) -> List[int]:
+    """
+    turns a comma separated query parameter such as "1,5,9" into ids
+    """
+    try:
+        return [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=422, detail=f"{name} must be comma separated integers"
+        )
+
+
+def parse_batch_ids(
+    ids: Optional[str], limit: Optional[int], cursor: Optional[int]
+) -> Optional[List[int]]:
+    """
+    ids of a batch lookup, None when the request is not one
+    """
+    if ids is None:
+        return None
+    if limit is not None or cursor is not None:
+        raise HTTPException(
+            status_code=422, detail="ids cannot be combined with limit or cursor"
+        )
+    batch_ids = parse_id_list(ids, "ids")
+    if len(batch_ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=422, detail=f"ids can list at most {MAX_BATCH_IDS} ids"
+        )
+    return batch_ids
+
+
+LIMIT_DESCRIPTION = "max number of rows to return"
+IDS_DESCRIPTION = (
+    "comma separated ids to look up, returned in this order. Ids with no "
+    "row are listed in the X-Missing-Ids header"
+)
+CURSOR_DESCRIPTION = "X-Next-Cursor header of the previous page"
+FIELDS_DESCRIPTION = "comma separated columns to return, id is always included"
+
+
 @app.get("/")
 def root():
     return {
@@ -78,13 +387,31 @@ def root():
     }
 
 
+@app.get("/cache/stats", include_in_schema=False)
+def read_cache_stats():
+    """
+    response cache entry count, size in bytes and hit/miss counters
+    """
+    if response_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **response_cache.stats()}
+
+
 @app.get(
     "/dqm1/monsters",
     response_model=List[MonsterDetailWithFamily],
     tags=["dqm1 monsters"],
 )
-async def read_monsters(
-    *, session: Session = Depends(get_session), family: Optional[int] = None
+def read_monsters(
+    *,
+    session: Session = Depends(get_session),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
+    response: Response,
+    family: Optional[int] = None,
+    ids: Optional[str] = Query(default=None, description=IDS_DESCRIPTION),
+    limit: Optional[int] = Query(default=None, ge=1, description=LIMIT_DESCRIPTION),
+    cursor: Optional[int] = Query(default=None, description=CURSOR_DESCRIPTION),
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION),
 ):
     """
     **Parameter Descriptions** <br>
@@ -92,12 +419,38 @@ async def read_monsters(
     **old_name** : name used in the game <br>
     **description** : in game beastiary description <br>
     **family** : a monster is part of one of 10 different monster families <br>
+    **limit**, **cursor** : page through monsters by id. The cursor for the
+    next page is in the X-Next-Cursor response header <br>
+    **ids** : only these monsters, in this order, e.g. ids=110,5,9. Ids that
+    match no monster are listed in the X-Missing-Ids response header <br>
+    **fields** : only return these columns, e.g. fields=new_name,old_name <br>
     """
-    monsters = select(MonsterDetail)
+    columns = parse_fields(fields, inspect(MonsterDetail).columns.keys())
+    monster_ids = parse_batch_ids(ids, limit, cursor)
+    if snapshot is not None:
+        if monster_ids is not None:
+            monsters: Sequence[Any] = order_by_request(
+                snapshot.read_monsters_by_id(monster_ids, family),
+                monster_ids,
+                response,
+            )
+        else:
+            monsters = keyset_slice(snapshot.read_monsters(family), cursor, limit)
+        return finish_page(monsters, response, limit, columns)
+    if columns:
+        query = select(*[getattr(MonsterDetail, name) for name in columns])
+    else:
+        query = select(MonsterDetail).options(*MONSTER_WITH_FAMILY)
+    query = query.order_by(col(MonsterDetail.id))
     if family:
-        monsters = monsters.where(MonsterDetail.family_id == family)
-    monsters_result = session.exec(monsters).all()
-    return monsters_result
+        query = query.where(MonsterDetail.family_id == family)
+    if monster_ids is not None:
+        query = query.where(col(MonsterDetail.id).in_(monster_ids))
+    query = keyset_query(query, MonsterDetail.id, cursor, limit)
+    monsters_result = fetch_rows(session, query, columns)
+    if monster_ids is not None:
+        monsters_result = order_by_request(monsters_result, monster_ids, response)
+    return finish_page(monsters_result, response, limit, columns)
 
 
 @app.get(
@@ -105,8 +458,16 @@ async def read_monsters(
     response_model=MonsterDetailWithFamily,
     tags=["dqm1 monsters"],
 )
-async def read_monster(*, session: Session = Depends(get_session), monster_id: int):
-    monster = session.get(MonsterDetail, monster_id)
+def read_monster(
+    *,
+    session: Session = Depends(get_session),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
+    monster_id: int,
+):
+    if snapshot is not None:
+        monster = snapshot.read_monster(monster_id)
+    else:
+        monster = session.get(MonsterDetail, monster_id, options=MONSTER_WITH_FAMILY)
     if not monster:
         raise HTTPException(status_code=404, detail="Monster not found")
     return monster
@@ -117,10 +478,18 @@ async def read_monster(*, session: Session = Depends(get_session), monster_id: i
     response_model=MonsterDetailSkill,
     tags=["dqm1 monsters"],
 )
-async def read_monster_skill(
-    *, session: Session = Depends(get_session), monster_id: int
+def read_monster_skill(
+    *,
+    session: Session = Depends(get_session),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
+    monster_id: int,
 ):
-    monster = session.get(MonsterDetail, monster_id)
+    if snapshot is not None:
+        monster = snapshot.read_monster(monster_id)
+    else:
+        monster = session.get(
+            MonsterDetail, monster_id, options=MONSTER_WITH_FAMILY_AND_SKILLS
+        )
     if not monster:
         raise HTTPException(status_code=404, detail="Monster not found")
     return monster
@@ -131,90 +500,408 @@ async def read_monster_skill(
     response_model=MonsterFamilyReadWithMonsterDetail,
     tags=["dqm1 monsters"],
 )
-async def read_family(*, session: Session = Depends(get_session), family_id: int):
-    family = session.get(MonsterFamily, family_id)
+def read_family(
+    *,
+    session: Session = Depends(get_session),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
+    family_id: int,
+):
+    if snapshot is not None:
+        family = snapshot.read_family(family_id)
+    else:
+        family = session.get(MonsterFamily, family_id, options=FAMILY_WITH_MONSTERS)
     if not family:
         raise HTTPException(status_code=404, detail="Family not found")
     return family
 
 
 @app.get("/dqm1/skills", tags=["dqm1 skills"])
-async def read_skills(
+def read_skills(
     *,
     session: Session = Depends(get_session),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
+    response: Response,
     category: Optional[SkillCategory] = None,
     skill_family: Optional[SkillFamily] = None,
+    ids: Optional[str] = Query(default=None, description=IDS_DESCRIPTION),
+    limit: Optional[int] = Query(default=None, ge=1, description=LIMIT_DESCRIPTION),
+    cursor: Optional[int] = Query(default=None, description=CURSOR_DESCRIPTION),
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION),
 ):
-    skills = select(Skill)
+    columns = parse_fields(fields, inspect(Skill).columns.keys())
+    skill_ids = parse_batch_ids(ids, limit, cursor)
+    if snapshot is not None:
+        if skill_ids is not None:
+            skills_page: Sequence[Any] = order_by_request(
+                snapshot.read_skills_by_id(skill_ids, category, skill_family),
+                skill_ids,
+                response,
+            )
+        else:
+            skills_page = keyset_slice(
+                snapshot.read_skills(category, skill_family), cursor, limit
+            )
+        return finish_page(skills_page, response, limit, columns)
+    if columns:
+        skills = select(*[getattr(Skill, name) for name in columns])
+    else:
+        skills = select(Skill)
+    skills = skills.order_by(col(Skill.id))
     if category:
         skills = skills.where(Skill.category_type == category)
     if skill_family:
         skills = skills.where(Skill.family_type == skill_family)
-    skills_result = session.exec(skills).all()
-    return skills_result
+    if skill_ids is not None:
+        skills = skills.where(col(Skill.id).in_(skill_ids))
+    skills = keyset_query(skills, Skill.id, cursor, limit)
+    skills_result = fetch_rows(session, skills, columns)
+    if skill_ids is not None:
+        skills_result = order_by_request(skills_result, skill_ids, response)
+    return finish_page(skills_result, response, limit, columns)
+
+
+# declared before /dqm1/skills/{skill_id}, which would take "eligible" as an id
+@app.get("/dqm1/skills/eligible", response_model=List[SkillRead], tags=["dqm1 skills"])
+def read_eligible_skills(
+    *,
+    skill_requirements: SkillRequirements = Depends(get_skill_requirements),
+    level: Optional[int] = None,
+    hp: Optional[int] = None,
+    mp: Optional[int] = None,
+    attack: Optional[int] = None,
+    defense: Optional[int] = None,
+    speed: Optional[int] = None,
+    intelligence: Optional[int] = None,
+):
+    """
+    Skills whose level and stat requirements a monster with these stats
+    meets. Stats left out are not checked.
+    """
+    profile = StatProfile(
+        level=level,
+        hp=hp,
+        mp=mp,
+        attack=attack,
+        defense=defense,
+        speed=speed,
+        intelligence=intelligence,
+    )
+    return skill_requirements.eligible(profile)
+
+
+@app.post("/dqm1/skills/eligible", response_model=List[List[int]], tags=["dqm1 skills"])
+def read_eligible_skills_batch(
+    *,
+    skill_requirements: SkillRequirements = Depends(get_skill_requirements),
+    profiles: List[StatProfile],
+):
+    """
+    Ids of the skills each stat profile can learn, in the order of the
+    profiles, e.g. for every monster of a party at once
+    """
+    if len(profiles) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"at most {MAX_BATCH_IDS} profiles can be sent at once",
+        )
+    return skill_requirements.eligible_ids(profiles)
 
 
 @app.get(
     "/dqm1/skills/{skill_id}", response_model=SkillUpgradeRead, tags=["dqm1 skills"]
 )
-async def read_skill(*, session: Session = Depends(get_session), skill_id: int):
-    skill = session.get(Skill, skill_id)
+def read_skill(
+    *,
+    session: Session = Depends(get_session),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
+    skill_id: int,
+):
+    if snapshot is not None:
+        skill = snapshot.read_skill(skill_id)
+    else:
+        skill = session.get(Skill, skill_id, options=SKILL_WITH_UPGRADES)
     if not skill:
         raise HTTPException(status_code=404, detail="Skill not found")
     return skill
 
 
+@app.get(
+    "/dqm1/skills/{skill_id}/chain",
+    response_model=List[SkillRead],
+    tags=["dqm1 skills"],
+)
+def read_skill_chain(
+    *,
+    skill_graph: SkillGraph = Depends(get_skill_graph),
+    skill_id: int,
+):
+    """
+    The whole upgrade chain the skill belongs to, in upgrade order
+    (Blaze, Blazemore, Blazemost). A skill without upgrades is alone.
+    """
+    if skill_id not in skill_graph.skills:
+        raise HTTPException(status_code=404, detail="Skill not found")
+    return skill_graph.chain(skill_id)
+
+
+@app.get(
+    "/dqm1/monsters/{monster_id}/learnable",
+    response_model=LearnableSkills,
+    tags=["dqm1 skills"],
+)
+def read_learnable_skills(
+    *,
+    skill_graph: SkillGraph = Depends(get_skill_graph),
+    monster_id: int,
+    inherited: Optional[str] = Query(
+        default=None, description="comma separated skill ids, e.g. 2,122"
+    ),
+):
+    """
+    Every skill the monster can eventually learn from its own skills and
+    the inherited ones: their upgrades, and the combo skills whose needed
+    skills are all known, repeated until nothing new is learned. Level and
+    stat requirements are not checked.
+    """
+    if monster_id not in skill_graph.monster_skills:
+        raise HTTPException(status_code=404, detail="Monster not found")
+    inherited_ids = parse_id_list(inherited, "inherited") if inherited else []
+    for skill_id in inherited_ids:
+        if skill_id not in skill_graph.skills:
+            raise HTTPException(status_code=404, detail="Skill not found")
+    return LearnableSkills(
+        monster_id=monster_id,
+        skills=skill_graph.learnable(monster_id, inherited_ids),
+    )
+
+
 @app.get(
     "/dqm1/skillcombine/{skill_id}",
     response_model=List[SkillCombineRead],
     tags=["dqm1 skills"],
 )
-async def get_skill_combo(*, session: Session = Depends(get_session), skill_id: int):
-    query = select(SkillCombine).where(SkillCombine.combo_skill_id == skill_id)
+def get_skill_combo(
+    *,
+    session: Session = Depends(get_session),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
+    skill_id: int,
+):
+    if snapshot is not None:
+        return snapshot.get_skill_combo(skill_id)
+    query = (
+        select(SkillCombine)
+        .options(*SKILL_COMBINE_WITH_NEEDED_SKILL)
+        .where(SkillCombine.combo_skill_id == skill_id)
+        .order_by(col(SkillCombine.id))
+    )
     skill = session.exec(query).all()
     return skill
 
 
 @app.get("/dqm1/items", tags=["dqm1 items"])
-async def read_items(
+def read_items(
     *,
     session: Session = Depends(get_session),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
+    response: Response,
     category: Optional[ItemCategory] = None,
     selllocation: Optional[ItemSellLocation] = None,
+    limit: Optional[int] = Query(default=None, ge=1, description=LIMIT_DESCRIPTION),
+    cursor: Optional[int] = Query(default=None, description=CURSOR_DESCRIPTION),
+    fields: Optional[str] = Query(default=None, description=FIELDS_DESCRIPTION),
 ):
-    items = select(Item)
+    columns = parse_fields(fields, inspect(Item).columns.keys())
+    if snapshot is not None:
+        items_page = keyset_slice(
+            snapshot.read_items(category, selllocation), cursor, limit
+        )
+        return finish_page(items_page, response, limit, columns)
+    if columns:
+        items = select(*[getattr(Item, name) for name in columns])
+    else:
+        items = select(Item)
+    items = items.order_by(col(Item.id))
     if category:
         items = items.where(Item.item_category == category)
     if selllocation:
         items = items.where(Item.sell_location == selllocation)
-    items_result = session.exec(items).all()
-    return items_result
+    items = keyset_query(items, Item.id, cursor, limit)
+    items_result = fetch_rows(session, items, columns)
+    return finish_page(items_result, response, limit, columns)
 
 
 @app.get("/dqm1/items/{item_id}", tags=["dqm1 items"])
-async def read_item(*, session: Session = Depends(get_session), item_id: int):
-    item = session.get(Item, item_id)
+def read_item(
+    *,
+    session: Session = Depends(get_session),
+    snapshot: Optional[Snapshot] = Depends(get_snapshot),
+    item_id: int,
+):
+    if snapshot is not None:
+        item = snapshot.read_item(item_id)
+    else:
+        item = session.get(Item, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     return item
 
 
+@app.get(
+    "/dqm1/sprites/atlas",
+    response_model=SpriteAtlas,
+    tags=["dqm1 monsters"],
+)
+def read_sprite_atlas(
+    *,
+    sprite_index: MonsterSpriteIndex = Depends(get_sprite_index),
+    ids: Optional[str] = Query(
+        default=None, description="comma separated monster ids, all when omitted"
+    ),
+):
+    """
+    Packs the sprites of the given monsters into one PNG image. <br>
+    **image_url** : the atlas image, an immutable URL <br>
+    **frames** : x, y, width and height of each monster's sprite in the
+    image, by monster id <br>
+    **missing** : requested monster ids without a sprite <br>
+    """
+    monster_ids = parse_id_list(ids, "ids") if ids is not None else None
+    if monster_ids == []:
+        raise HTTPException(
+            status_code=422, detail="ids must list at least one monster id"
+        )
+    return sprite_index.atlas(monster_ids)
+
+
+@app.get(
+    "/dqm1/sprites/missing",
+    response_model=List[MissingSprite],
+    tags=["dqm1 monsters"],
+)
+def read_missing_sprites(
+    *, sprite_index: MonsterSpriteIndex = Depends(get_sprite_index)
+):
+    """
+    Monsters without a sprite file named after their old_name, whose
+    sprite field is null
+    """
+    return sprite_index.missing
+
+
+@app.get("/dqm1/search", response_model=List[SearchResult], tags=["dqm1 search"])
+def search(
+    *,
+    q: str = Query(min_length=1, max_length=100),
+    kind: Optional[str] = Query(default=None, description="monster, skill or item"),
+    limit: int = Query(default=10, ge=1, le=100),
+    search_index: SearchIndex = Depends(get_search_index),
+):
+    """
+    Monsters, skills and items whose names or descriptions match q, best
+    match first. Words are matched by their trigrams, so small typos
+    ("slme", "dragn") still find them.
+    """
+    if kind is not None and kind not in KINDS:
+        raise HTTPException(
+            status_code=422, detail=f"kind must be one of {', '.join(KINDS)}"
+        )
+    return search_index.search(q, kind=kind, limit=limit)
+
+
+@app.get("/dqm1/autocomplete", response_model=List[NameMatch], tags=["dqm1 search"])
+def autocomplete(
+    *,
+    prefix: str = Query(min_length=1, max_length=100),
+    kind: Optional[str] = Query(default=None, description="monster or skill"),
+    limit: int = Query(default=10, ge=1, le=100),
+    autocomplete_index: AutocompleteIndex = Depends(get_autocomplete_index),
+):
+    """
+    Monster and skill names (new or old) starting with prefix, then names
+    with a later word starting with it, for pickers that ask on every
+    keystroke
+    """
+    if kind is not None and kind not in AUTOCOMPLETE_KINDS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"kind must be one of {', '.join(AUTOCOMPLETE_KINDS)}",
+        )
+    return autocomplete_index.complete(prefix, kind=kind, limit=limit)
+
+
+@app.get(
+    "/dqm1/breeding/plan",
+    response_model=BreedingPlan,
+    tags=["dqm1 monsters"],
+)
+def get_breeding_plan(
+    *,
+    planner: BreedingPlanner = Depends(get_breeding_planner),
+    target: int,
+    roster: str = Query(description="comma separated monster ids, e.g. 1,5"),
+    max_depth: int = Query(default=4, ge=1, le=10),
+):
+    """
+    Finds the fewest breedings that make the target monster from the monsters
+    in the roster, breeding at most max_depth generations deep. <br>
+    Parents that can be any monster of a family are filled with the cheapest
+    monster of that family. Roster monsters can be reused as parents.
+    """
+    roster_ids = parse_id_list(roster, "roster")
+    for monster_id in [target, *roster_ids]:
+        if monster_id not in planner.monsters:
+            raise HTTPException(status_code=404, detail="Monster not found")
+    plan = planner.plan(target, roster_ids, max_depth)
+    if plan is None:
+        raise HTTPException(
+            status_code=404, detail="No breeding plan found within max_depth"
+        )
+    return plan
+
+
+@app.get(
+    "/dqm1/breeding/reachable",
+    response_model=BreedingReachable,
+    tags=["dqm1 monsters"],
+)
+def get_breeding_reachable(
+    *,
+    reachability: BreedingReachability = Depends(get_breeding_reachability),
+    roster: str = Query(description="comma separated monster ids, e.g. 1,5"),
+):
+    """
+    Every monster the roster can breed, any number of generations deep,
+    with the roster itself. Parents that can be any monster of a family
+    accept any roster or bred monster of that family.
+    """
+    roster_ids = parse_id_list(roster, "roster")
+    for monster_id in roster_ids:
+        if monster_id not in reachability.bits:
+            raise HTTPException(status_code=404, detail="Monster not found")
+    return BreedingReachable(
+        roster=sorted(set(roster_ids)),
+        reachable=reachability.reachable(roster_ids),
+    )
+
+
 @app.get(
     "/dqm1/breeding/{monster_id}",
     response_model=List[MonsterBreedingLinkReadWithInfo],
     tags=["dqm1 monsters"],
 )
-async def get_breeding_combos(
-    *, session: Session = Depends(get_session), monster_id: int
+def get_breeding_combos(
+    *,
+    breeding_index: BreedingIndex = Depends(get_breeding_index),
+    monster_id: int,
+    include_family: bool = Query(
+        default=False,
+        description="also list combinations taking any monster of its family",
+    ),
 ):
     """
     Given a monster_id, finds all breeding combination that results in
-    the target monster or uses the target monster as a parent
+    the target monster or uses the target monster as a parent. <br>
+    With include_family, combinations whose parent can be any monster of the
+    target's family (pedigree_family/family2) are listed too.
     """
-    query = select(MonsterBreedingLink).where(
-        (MonsterBreedingLink.child_id == monster_id)
-        | (MonsterBreedingLink.pedigree_id == monster_id)
-        | (MonsterBreedingLink.parent2_id == monster_id)
-    )
-    breeding_combos = session.exec(query).all()
-    return breeding_combos
+    return breeding_index.combos(monster_id, include_family)
@@ -1,5 +1,6 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 
@@ -12,10 +13,12 @@ class MonsterSkillLink(SQLModel, table=True):
     monster_id: Optional[int] = Field(
         default=None,
         foreign_key="monsterdetail.id",
+        index=True,
     )
     skill_id: Optional[int] = Field(
         default=None,
         foreign_key="skill.id",
+        index=True,
     )
 
 
@@ -29,7 +32,7 @@ class MonsterDetailBase(SQLModel):
     description: str
 
     # one-to-many relation where a family is linked to many monsters
-    family_id: int = Field(foreign_key="monsterfamily.id")
+    family_id: int = Field(foreign_key="monsterfamily.id", index=True)
 
 
 class MonsterDetail(MonsterDetailBase, table=True):
@@ -40,9 +43,32 @@ class MonsterDetail(MonsterDetailBase, table=True):
         back_populates="monsters", link_model=MonsterSkillLink
     )
 
+    @property
+    def sprite(self) -> Optional["MonsterSprite"]:
+        """
+        sprite file matched by old_name, from the sprites read at startup
+        """
+        # imported here, sprites.py imports this module
+        from src.app.sprites import sprite_store
+
+        return sprite_store.monster_sprite(self.old_name)
+
+
+class MonsterSprite(SQLModel):
+    """
+    image_url : immutable URL of the monster's sprite
+    content_hash : changes whenever the image does
+    """
+
+    image_url: str
+    width: int
+    height: int
+    content_hash: str
+
 
 class MonsterDetailRead(MonsterDetailBase):
     id: int
+    sprite: Optional[MonsterSprite] = None
 
 
 class MonsterFamilyBase(SQLModel):
@@ -75,13 +101,21 @@ class MonsterFamilyReadWithMonsterDetail(MonsterFamilyRead):
 
 
 class MonsterBreedingLinkBase(SQLModel):
-    child_id: Optional[int] = Field(default=None, foreign_key="monsterdetail.id")
-    pedigree_id: Optional[int] = Field(default=None, foreign_key="monsterdetail.id")
-    parent2_id: Optional[int] = Field(default=None, foreign_key="monsterdetail.id")
+    child_id: Optional[int] = Field(
+        default=None, foreign_key="monsterdetail.id", index=True
+    )
+    pedigree_id: Optional[int] = Field(
+        default=None, foreign_key="monsterdetail.id", index=True
+    )
+    parent2_id: Optional[int] = Field(
+        default=None, foreign_key="monsterdetail.id", index=True
+    )
     pedigree_family_id: Optional[int] = Field(
-        default=None, foreign_key="monsterfamily.id"
+        default=None, foreign_key="monsterfamily.id", index=True
+    )
+    family2_id: Optional[int] = Field(
+        default=None, foreign_key="monsterfamily.id", index=True
     )
-    family2_id: Optional[int] = Field(default=None, foreign_key="monsterfamily.id")
 
 
 class MonsterBreedingLink(MonsterBreedingLinkBase, table=True):
@@ -147,6 +181,116 @@ class MonsterBreedingLinkReadWithInfo(MonsterBreedingLinkRead):
     family2: Optional[MonsterFamilyRead]
 
 
+class MonsterBreedingExpansion(SQLModel, table=True):
+    """
+    One concrete (pedigree, parent2) pair of a MonsterBreedingLink that takes
+    any monster of a family as a parent (pedigree_family_id/family2_id).
+    Generated by create_database.py from the links and MonsterDetail.family_id,
+    not loaded from a csv file.
+    """
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    link_id: int = Field(foreign_key="monsterbreedinglink.id", index=True)
+    child_id: int = Field(foreign_key="monsterdetail.id", index=True)
+    pedigree_id: int = Field(foreign_key="monsterdetail.id", index=True)
+    parent2_id: int = Field(foreign_key="monsterdetail.id", index=True)
+
+
+class BreedingPlanNode(SQLModel):
+    """
+    One monster in a breeding plan. Monsters taken from the roster have no
+    combo_id and no parents. Otherwise combo_id is the MonsterBreedingLink
+    used to breed it from pedigree and parent2.
+    """
+
+    monster_id: int
+    new_name: Optional[str] = None
+    old_name: Optional[str] = None
+    combo_id: Optional[int] = None
+    pedigree: Optional["BreedingPlanNode"] = None
+    parent2: Optional["BreedingPlanNode"] = None
+
+
+class BreedingPlan(SQLModel):
+    """
+    breedings : number of breedings in the whole plan
+    generations : depth of the breeding tree
+    """
+
+    target_id: int
+    roster: List[int]
+    breedings: int
+    generations: int
+    plan: BreedingPlanNode
+
+
+class BreedingReachable(SQLModel):
+    """
+    reachable : the roster and every monster it can breed, any number of
+    generations deep
+    """
+
+    roster: List[int]
+    reachable: List[int]
+
+
+class SpriteFrame(SQLModel):
+    """
+    position of one sprite in an atlas image, in pixels
+    """
+
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+class MissingSprite(SQLModel):
+    """
+    a monster without a sprite file named after its old_name
+    """
+
+    monster_id: int
+    old_name: str
+    expected_file: str
+
+
+class SpriteAtlas(SQLModel):
+    """
+    frames : position of each monster's sprite in the image, by monster id
+    missing : requested monster ids without a sprite
+    """
+
+    image_url: str
+    width: int
+    height: int
+    frames: Dict[int, SpriteFrame]
+    missing: List[int]
+
+
+class SearchResult(SQLModel):
+    """
+    kind : "monster", "skill" or "item", id is that table's id
+    score : higher is a closer match
+    """
+
+    kind: str
+    id: int
+    name: str
+    score: float
+
+
+class NameMatch(SQLModel):
+    """
+    kind : "monster" or "skill", id is that table's id
+    name : the new or old name that matched
+    """
+
+    kind: str
+    id: int
+    name: str
+
+
 class SkillBase(SQLModel):
     """
     Shows description, MP cost, and required stats to learn skill.
@@ -169,11 +313,17 @@ class SkillBase(SQLModel):
 
 
 class Skill(SkillBase, table=True):
+    # composite index for read_skills() filtering by category and family
+    __table_args__ = (
+        Index("ix_skill_category_type_family_type", "category_type", "family_type"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
 
     upgrade_to_id: Optional[int] = Field(
         foreign_key="skill.id",  # lowercase refers to database table name
         default=None,
+        index=True,
     )
     upgrade_to: Optional["Skill"] = Relationship(
         sa_relationship_kwargs={
@@ -186,6 +336,7 @@ class Skill(SkillBase, table=True):
     upgrade_from_id: Optional[int] = Field(
         foreign_key="skill.id",
         default=None,
+        index=True,
     )
     upgrade_from: Optional["Skill"] = Relationship(
         sa_relationship_kwargs={
@@ -218,8 +369,12 @@ class MonsterDetailSkill(MonsterDetailWithFamily):
 
 
 class SkillCombineBase(SQLModel):
-    combo_skill_id: Optional[int] = Field(default=None, foreign_key="skill.id")
-    needed_skill_id: Optional[int] = Field(default=None, foreign_key="skill.id")
+    combo_skill_id: Optional[int] = Field(
+        default=None, foreign_key="skill.id", index=True
+    )
+    needed_skill_id: Optional[int] = Field(
+        default=None, foreign_key="skill.id", index=True
+    )
 
 
 class SkillCombine(SkillCombineBase, table=True):
@@ -250,11 +405,47 @@ class SkillCombineRead(SkillCombineBase):
     needed_skill: Optional[SkillRead]
 
 
+class StatProfile(SQLModel):
+    """
+    A monster's level and stats. A stat left out is not checked.
+    """
+
+    level: Optional[int] = None
+    hp: Optional[int] = None
+    mp: Optional[int] = None
+    attack: Optional[int] = None
+    defense: Optional[int] = None
+    speed: Optional[int] = None
+    intelligence: Optional[int] = None
+
+
+class LearnableSkill(SQLModel):
+    """
+    source : "natural" (one of the monster's own skills), "inherited",
+    "upgrade" (upgraded from from_skill_ids[0]) or "combo" (learned once all
+    of from_skill_ids are known)
+    """
+
+    skill: SkillRead
+    source: str
+    from_skill_ids: List[int] = []
+
+
+class LearnableSkills(SQLModel):
+    monster_id: int
+    skills: List[LearnableSkill]
+
+
 class Item(SQLModel, table=True):
     """
     Lists all items sold in shops and found in the field
     """
 
+    # composite index for read_items() filtering by category and sell location
+    __table_args__ = (
+        Index("ix_item_item_category_sell_location", "item_category", "sell_location"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     item_name: str
     item_category: str
@@ -0,0 +1,126 @@
+"""
+Keyset pagination, batch lookups and field selection shared by the list
+endpoints.
+
+Pages are keyed on the primary key: cursor is the last id of the previous
+page, and the next page starts after it. When more rows follow, the id to
+pass as the next cursor is sent in the X-Next-Cursor header.
+
+A batch lookup (ids=1,5,9) returns rows in the requested order instead, and
+lists requested ids that matched no row in the X-Missing-Ids header.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from sqlmodel import Session
+
+from src.app.json_response import JSONResponseClass
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MISSING_IDS_HEADER = "X-Missing-Ids"
+MAX_BATCH_IDS = 1000
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """
+    turns fields=new_name,old_name into column names. id is always included
+    since it is the pagination key.
+    """
+    if fields is None:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown fields: {', '.join(unknown)}. "
+            f"Choose from: {', '.join(allowed)}",
+        )
+    return ["id"] + [name for name in names if name != "id"]
+
+
+def keyset_query(query, id_column, cursor: Optional[int], limit: Optional[int]):
+    """
+    restricts a select() to one page. One extra row is fetched to tell
+    whether there is a next page.
+    """
+    if cursor is not None:
+        query = query.where(id_column > cursor)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    return query
+
+
+def fetch_rows(session: Session, query, columns: Optional[List[str]]) -> Sequence[Any]:
+    """
+    runs a list query. A fields projection goes through execute(), which
+    always returns rows: exec() returns bare values for a single column, as
+    with fields=id.
+    """
+    if columns:
+        return session.execute(query).all()
+    return session.exec(query).all()
+
+
+def keyset_slice(
+    rows: Sequence[Any], cursor: Optional[int], limit: Optional[int]
+) -> Sequence[Any]:
+    """
+    the same page as keyset_query() from rows already sorted by id
+    """
+    start = 0
+    if cursor is not None:
+        low, high = 0, len(rows)
+        while low < high:
+            middle = (low + high) // 2
+            if rows[middle].id <= cursor:
+                low = middle + 1
+            else:
+                high = middle
+        start = low
+    if limit is None:
+        return rows[start:]
+    return rows[start : start + limit + 1]
+
+
+def order_by_request(
+    rows: Sequence[Any], ids: Sequence[int], response: Response
+) -> List[Any]:
+    """
+    rows in the order of ids, each id once, with the ids that have no row
+    listed in the missing ids header
+    """
+    rows_by_id: Dict[int, Any] = {row.id: row for row in rows}
+    ordered = []
+    missing = []
+    for row_id in dict.fromkeys(ids):
+        row = rows_by_id.get(row_id)
+        if row is None:
+            missing.append(row_id)
+        else:
+            ordered.append(row)
+    if missing:
+        response.headers[MISSING_IDS_HEADER] = ",".join(map(str, missing))
+    return ordered
+
+
+def finish_page(
+    rows: Sequence[Any],
+    response: Response,
+    limit: Optional[int],
+    columns: Optional[List[str]] = None,
+):
+    """
+    drops the extra row fetched by keyset_query()/keyset_slice(), sets the
+    next cursor header, and when columns are given returns only those
+    fields (skipping the route's response_model).
+    """
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = str(rows[-1].id)
+    if columns is None:
+        return rows
+    content = [{name: getattr(row, name) for name in columns} for row in rows]
+    return JSONResponseClass(jsonable_encoder(content), headers=dict(response.headers))
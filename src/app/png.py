@@ -0,0 +1,135 @@
+"""
+Minimal PNG reading and writing for the 8-bit RGB/RGBA monster sprites, so
+sprite atlases can be built without an imaging library.
+"""
+
+import struct
+import zlib
+from typing import List, NamedTuple
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# channels per PNG color type (truecolor, truecolor with alpha)
+CHANNELS = {2: 3, 6: 4}
+
+
+class PngImage(NamedTuple):
+    """
+    rows are the unfiltered scanlines, width * channels bytes each
+    """
+
+    width: int
+    height: int
+    color_type: int
+    rows: List[bytes]
+
+    @property
+    def channels(self) -> int:
+        return CHANNELS[self.color_type]
+
+
+def _chunks(data: bytes):
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("not a PNG file")
+    position = len(PNG_SIGNATURE)
+    while position < len(data):
+        (length,) = struct.unpack(">I", data[position : position + 4])
+        chunk_type = data[position + 4 : position + 8]
+        yield chunk_type, data[position + 8 : position + 8 + length]
+        position += length + 12
+
+
+def read_size(data: bytes):
+    """
+    (width, height) from the IHDR chunk, without decoding the image
+    """
+    for chunk_type, chunk in _chunks(data):
+        if chunk_type == b"IHDR":
+            return struct.unpack(">II", chunk[:8])
+    raise ValueError("PNG file has no IHDR chunk")
+
+
+def _paeth(left: int, up: int, up_left: int) -> int:
+    estimate = left + up - up_left
+    distance_left = abs(estimate - left)
+    distance_up = abs(estimate - up)
+    distance_up_left = abs(estimate - up_left)
+    if distance_left <= distance_up and distance_left <= distance_up_left:
+        return left
+    if distance_up <= distance_up_left:
+        return up
+    return up_left
+
+
+def _unfilter(filter_type: int, line: bytes, prior: bytes, bpp: int) -> bytes:
+    """
+    reverses one scanline filter. Type 0 (None), the one the sprites use,
+    needs no work. The rest are done byte by byte.
+    """
+    if filter_type == 0:
+        return line
+    row = bytearray(line)
+    for x in range(len(row)):
+        left = row[x - bpp] if x >= bpp else 0
+        up = prior[x]
+        if filter_type == 1:
+            predictor = left
+        elif filter_type == 2:
+            predictor = up
+        elif filter_type == 3:
+            predictor = (left + up) // 2
+        elif filter_type == 4:
+            predictor = _paeth(left, up, prior[x - bpp] if x >= bpp else 0)
+        else:
+            raise ValueError(f"unknown PNG filter type {filter_type}")
+        row[x] = (row[x] + predictor) & 0xFF
+    return bytes(row)
+
+
+def read_png(data: bytes) -> PngImage:
+    header = None
+    compressed = []
+    for chunk_type, chunk in _chunks(data):
+        if chunk_type == b"IHDR":
+            header = struct.unpack(">IIBBBBB", chunk)
+        elif chunk_type == b"IDAT":
+            compressed.append(chunk)
+    if header is None:
+        raise ValueError("PNG file has no IHDR chunk")
+    width, height, bit_depth, color_type, _, _, interlace = header
+    if bit_depth != 8 or color_type not in CHANNELS or interlace:
+        raise ValueError(
+            "only 8-bit, non-interlaced RGB or RGBA PNG files are supported"
+        )
+
+    bpp = CHANNELS[color_type]
+    stride = width * bpp
+    raw = zlib.decompress(b"".join(compressed))
+    rows = []
+    prior = bytes(stride)
+    for y in range(height):
+        start = y * (stride + 1)
+        row = _unfilter(raw[start], raw[start + 1 : start + 1 + stride], prior, bpp)
+        rows.append(row)
+        prior = row
+    return PngImage(width, height, color_type, rows)
+
+
+def _chunk(chunk_type: bytes, data: bytes) -> bytes:
+    crc = zlib.crc32(chunk_type + data)
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", crc)
+
+
+def write_png(image: PngImage, level: int = 6) -> bytes:
+    """
+    encodes every scanline with filter type 0
+    """
+    header = struct.pack(
+        ">IIBBBBB", image.width, image.height, 8, image.color_type, 0, 0, 0
+    )
+    raw = b"".join(b"\x00" + row for row in image.rows)
+    return (
+        PNG_SIGNATURE
+        + _chunk(b"IHDR", header)
+        + _chunk(b"IDAT", zlib.compress(raw, level))
+        + _chunk(b"IEND", b"")
+    )
@@ -0,0 +1,237 @@
+"""
+Cache of fully rendered responses for the read-only /dqm1/* routes.
+
+The dataset never changes while the app runs, so the encoded bytes of a
+response can be stored once per (path, normalized query) and sent again
+without running the route or pydantic validation. Compressed variants of
+each body are made when it is stored (at warm-up), so compression is paid
+once per response rather than once per request.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from src.app.compression import (
+    MINIMUM_SIZE,
+    compress,
+    encoded_headers,
+    get_header,
+    is_compressible,
+    negotiate_encoding,
+)
+
+CacheKey = Tuple[str, str]
+Headers = List[Tuple[bytes, bytes]]
+
+
+@dataclass
+class CachedResponse:
+    """
+    headers exclude Content-Length, which depends on the variant sent.
+    variants maps a content coding to the compressed body.
+    """
+
+    status: int
+    headers: Headers
+    body: bytes
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        return (
+            len(self.body)
+            + sum(len(body) for body in self.variants.values())
+            + sum(len(k) + len(v) for k, v in self.headers)
+        )
+
+
+def cache_key(path: str, query_string: bytes) -> CacheKey:
+    """
+    query parameters are sorted so ?a=1&b=2 and ?b=2&a=1 share an entry
+    """
+    query = parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)
+    return path, urlencode(sorted(query))
+
+
+class ResponseCache:
+    """
+    LRU store of rendered responses, bounded by number of entries and total
+    bytes, with hit/miss counters.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: CacheKey, entry: CachedResponse):
+        if entry.size > self.max_bytes:
+            return
+        old_entry = self._entries.pop(key, None)
+        if old_entry is not None:
+            self._bytes -= old_entry.size
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class ResponseCacheMiddleware:
+    """
+    ASGI middleware serving GET requests under path_prefix from a
+    ResponseCache. Only 200 responses are stored. Responses carry an X-Cache
+    header of HIT or MISS.
+
+    Stored bodies are also compressed with each of encodings, and a hit is
+    sent in the best one the client accepts.
+    """
+
+    def __init__(
+        self,
+        app,
+        cache: ResponseCache,
+        encodings: Sequence[str] = (),
+        path_prefix: str = "/dqm1/",
+    ):
+        self.app = app
+        self.cache = cache
+        self.encodings = list(encodings)
+        self.path_prefix = path_prefix
+
+    def _make_entry(self, headers: Headers, body: bytes) -> CachedResponse:
+        entry = CachedResponse(
+            status=200,
+            headers=[(k, v) for k, v in headers if k.lower() != b"content-length"],
+            body=body,
+        )
+        if is_compressible(headers) and len(body) >= MINIMUM_SIZE:
+            for encoding in self.encodings:
+                compressed = compress(body, encoding, best=True)
+                if len(compressed) < len(body):
+                    entry.variants[encoding] = compressed
+        return entry
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not scope["path"].startswith(self.path_prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key = cache_key(scope["path"], scope["query_string"])
+        entry = self.cache.get(key)
+        if entry is not None:
+            accept_encoding = get_header(scope["headers"], b"accept-encoding") or b""
+            encoding = negotiate_encoding(
+                accept_encoding.decode(), list(entry.variants)
+            )
+            if encoding is None:
+                body = entry.body
+                headers = entry.headers + [(b"content-length", str(len(body)).encode())]
+            else:
+                body = entry.variants[encoding]
+                headers = encoded_headers(entry.headers, body, encoding)
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": entry.status,
+                    "headers": headers + [(b"x-cache", b"HIT")],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        start_message = {}
+        body_parts = []
+
+        async def send_and_store(message):
+            if message["type"] == "http.response.start":
+                start_message.update(message)
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-cache", b"MISS")
+                ]
+            elif message["type"] == "http.response.body":
+                body_parts.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    headers = list(start_message.get("headers", []))
+                    if start_message.get("status") == 200 and (
+                        get_header(headers, b"content-encoding") is None
+                    ):
+                        entry = self._make_entry(headers, b"".join(body_parts))
+                        self.cache.put(key, entry)
+            await send(message)
+
+        await self.app(scope, receive, send_and_store)
+
+
+async def warm_up(app, paths: Iterable[str]):
+    """
+    requests every path once through app so the cache middleware stores the
+    responses before real traffic arrives
+    """
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def discard(message):
+        pass
+
+    for path in paths:
+        path, _, query_string = path.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query_string.encode(),
+            "root_path": "",
+            "headers": [(b"host", b"warm-up")],
+            "client": None,
+            "server": None,
+        }
+        await app(scope, receive, discard)
@@ -0,0 +1,292 @@
+"""
+In-memory, typo-tolerant search over monster, skill and item text, and
+prefix autocompletion of monster and skill names.
+
+Every word of the searchable text is split into trigrams. A query word
+matches the indexed words sharing enough trigrams with it (Jaccard
+similarity, as in PostgreSQL's pg_trgm), so "slme" still finds "slime".
+A document's score is the average, over the query words, of its best
+matching word, weighted by the field the word is in.
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlmodel import Session, col, select
+
+from src.app.models import Item, MonsterDetail, NameMatch, SearchResult, Skill
+
+# smallest trigram similarity for a query word to match an indexed word
+MIN_SIMILARITY = 0.3
+# weight of a match in each kind of field
+NAME_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+# added when a name starts with the whole query
+PREFIX_BONUS = 0.5
+
+KINDS = ("monster", "skill", "item")
+AUTOCOMPLETE_KINDS = ("monster", "skill")
+
+# (normalized name, kind, id, name) sorted by normalized name
+NameEntry = Tuple[str, str, int, str]
+
+
+class SearchDocument(NamedTuple):
+    kind: str
+    id: int
+    name: str
+    names: Tuple[str, ...]
+    description: str
+
+
+def normalize(text: str) -> str:
+    """
+    lowercase ASCII, accents removed
+    """
+    text = unicodedata.normalize("NFKD", text)
+    return text.encode("ascii", "ignore").decode().lower()
+
+
+def words(text: str) -> List[str]:
+    """
+    words of text. CamelCase names (DrakSlime) also give their parts.
+    """
+    result = []
+    for word in re.findall(r"[A-Za-z0-9]+", text):
+        result.append(normalize(word))
+        parts = re.findall(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|[0-9]+", word)
+        if len(parts) > 1:
+            result.extend(normalize(part) for part in parts)
+    return [word for word in result if word]
+
+
+def trigrams(word: str) -> FrozenSet[str]:
+    padded = f"  {word} "
+    return frozenset(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+class SearchIndex:
+    """
+    Trigram index over the names and descriptions of monsters, skills and
+    items, built once.
+    """
+
+    def __init__(self, documents: Iterable[SearchDocument]):
+        self.documents = list(documents)
+        self._word_ids: Dict[str, int] = {}
+        self._word_trigrams: List[FrozenSet[str]] = []
+        self._trigram_words: Dict[str, List[int]] = defaultdict(list)
+        # (document index, weight) of each indexed word
+        self._word_postings: List[Dict[int, float]] = []
+        self._names = [
+            [normalize(name) for name in document.names] for document in self.documents
+        ]
+
+        for doc_index, document in enumerate(self.documents):
+            for name in document.names:
+                for word in words(name):
+                    self._add(word, doc_index, NAME_WEIGHT)
+            for word in words(document.description):
+                self._add(word, doc_index, DESCRIPTION_WEIGHT)
+
+    def _add(self, word: str, doc_index: int, weight: float):
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            word_id = self._word_ids[word] = len(self._word_trigrams)
+            word_trigrams = trigrams(word)
+            self._word_trigrams.append(word_trigrams)
+            self._word_postings.append({})
+            for trigram in word_trigrams:
+                self._trigram_words[trigram].append(word_id)
+        postings = self._word_postings[word_id]
+        postings[doc_index] = max(postings.get(doc_index, 0.0), weight)
+
+    @classmethod
+    def from_rows(
+        cls,
+        monsters: Iterable[MonsterDetail],
+        skills: Iterable[Skill],
+        items: Iterable[Item],
+    ) -> "SearchIndex":
+        documents = [
+            SearchDocument(
+                "monster",
+                monster.id,
+                monster.new_name,
+                (monster.new_name, monster.old_name),
+                monster.description,
+            )
+            for monster in monsters
+            if monster.id is not None
+        ]
+        documents += [
+            SearchDocument(
+                "skill",
+                skill.id,
+                skill.new_name or skill.old_name,
+                tuple(name for name in (skill.new_name, skill.old_name) if name),
+                skill.description,
+            )
+            for skill in skills
+            if skill.id is not None
+        ]
+        documents += [
+            SearchDocument(
+                "item",
+                item.id,
+                item.item_name,
+                (item.item_name,),
+                item.item_description,
+            )
+            for item in items
+            if item.id is not None
+        ]
+        return cls(documents)
+
+    @classmethod
+    def load(cls, session: Session) -> "SearchIndex":
+        return cls.from_rows(
+            session.exec(select(MonsterDetail).order_by(col(MonsterDetail.id))).all(),
+            session.exec(select(Skill).order_by(col(Skill.id))).all(),
+            session.exec(select(Item).order_by(col(Item.id))).all(),
+        )
+
+    def _matching_words(self, word: str) -> Dict[int, float]:
+        """
+        indexed words similar to word, with their similarity
+        """
+        query_trigrams = trigrams(word)
+        shared = Counter(
+            word_id
+            for trigram in query_trigrams
+            for word_id in self._trigram_words.get(trigram, ())
+        )
+        matches = {}
+        for word_id, count in shared.items():
+            similarity = count / (
+                len(query_trigrams) + len(self._word_trigrams[word_id]) - count
+            )
+            if similarity >= MIN_SIMILARITY:
+                matches[word_id] = similarity
+        return matches
+
+    def search(
+        self, query: str, kind: Optional[str] = None, limit: int = 10
+    ) -> List[SearchResult]:
+        """
+        best matching documents, highest score first
+        """
+        query_words = list(dict.fromkeys(words(query)))
+        if not query_words:
+            return []
+
+        # best weighted similarity of each document for each query word
+        scores: Dict[int, List[float]] = defaultdict(lambda: [0.0] * len(query_words))
+        for position, query_word in enumerate(query_words):
+            for word_id, similarity in self._matching_words(query_word).items():
+                for doc_index, weight in self._word_postings[word_id].items():
+                    doc_scores = scores[doc_index]
+                    doc_scores[position] = max(
+                        doc_scores[position], similarity * weight
+                    )
+
+        normalized_query = normalize(query).strip()
+        ranked = []
+        for doc_index, doc_scores in scores.items():
+            document = self.documents[doc_index]
+            if kind is not None and document.kind != kind:
+                continue
+            score = sum(doc_scores) / len(query_words)
+            if any(
+                name.startswith(normalized_query) for name in self._names[doc_index]
+            ):
+                score += PREFIX_BONUS
+            ranked.append((-score, doc_index))
+        ranked.sort()
+
+        return [
+            SearchResult(
+                kind=self.documents[doc_index].kind,
+                id=self.documents[doc_index].id,
+                name=self.documents[doc_index].name,
+                score=round(-negative_score, 4),
+            )
+            for negative_score, doc_index in ranked[:limit]
+        ]
+
+
+class AutocompleteIndex:
+    """
+    Sorted arrays of monster and skill names (new and old), searched with
+    bisect so a prefix lookup is O(log n + limit).
+
+    Names starting with the prefix come first, then names with a later word
+    starting with it ("slime" completes "Drake Slime"), each alphabetically.
+    """
+
+    def __init__(self, names: Iterable[Tuple[str, int, str]]):
+        starts: Dict[Optional[str], List[NameEntry]] = defaultdict(list)
+        inner: Dict[Optional[str], List[NameEntry]] = defaultdict(list)
+        for kind, row_id, name in names:
+            key = normalize(name)
+            for kind_key in (None, kind):
+                starts[kind_key].append((key, kind, row_id, name))
+                for match in re.finditer(r"(?<=[^a-z0-9])[a-z0-9]", key):
+                    inner[kind_key].append((key[match.start() :], kind, row_id, name))
+        self._arrays = {
+            kind_key: (sorted(set(starts[kind_key])), sorted(set(inner[kind_key])))
+            for kind_key in starts
+        }
+
+    @classmethod
+    def from_rows(
+        cls, monsters: Iterable[MonsterDetail], skills: Iterable[Skill]
+    ) -> "AutocompleteIndex":
+        names = [
+            ("monster", monster.id, name)
+            for monster in monsters
+            if monster.id is not None
+            for name in (monster.new_name, monster.old_name)
+        ]
+        names += [
+            ("skill", skill.id, name)
+            for skill in skills
+            if skill.id is not None
+            for name in (skill.new_name, skill.old_name)
+            if name
+        ]
+        return cls(names)
+
+    @classmethod
+    def load(cls, session: Session) -> "AutocompleteIndex":
+        return cls.from_rows(
+            session.exec(select(MonsterDetail).order_by(col(MonsterDetail.id))).all(),
+            session.exec(select(Skill).order_by(col(Skill.id))).all(),
+        )
+
+    def complete(
+        self, prefix: str, kind: Optional[str] = None, limit: int = 10
+    ) -> List[NameMatch]:
+        """
+        up to limit names starting with prefix, one per monster or skill
+        """
+        prefix = normalize(prefix).strip()
+        if not prefix or kind not in self._arrays:
+            return []
+        seen = set()
+        matches = []
+        for entries in self._arrays[kind]:
+            index = bisect_left(entries, (prefix,))
+            while index < len(entries) and entries[index][0].startswith(prefix):
+                _, entry_kind, row_id, name = entries[index]
+                index += 1
+                if (entry_kind, row_id) in seen:
+                    continue
+                seen.add((entry_kind, row_id))
+                matches.append(NameMatch(kind=entry_kind, id=row_id, name=name))
+                if len(matches) == limit:
+                    return matches
+        return matches
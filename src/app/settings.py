@@ -0,0 +1,134 @@
+"""
+Runtime settings read from environment variables.
+Every variable is prefixed with DQM_ (e.g. DQM_SNAPSHOT_MODE=1)
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    return int(value)
+
+
+def _env_str(name: str, default: Optional[str] = None) -> Optional[str]:
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip()
+
+
+def _env_echo(name: str) -> Union[bool, str]:
+    """
+    SQLAlchemy's echo flag: False, True (log statements) or "debug" (also
+    log result rows)
+    """
+    value = _env_str(name)
+    if value is not None and value.lower() == "debug":
+        return "debug"
+    return _env_bool(name)
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    snapshot_mode : load the whole dataset into memory at startup and serve
+    every /dqm1/* route from it instead of the sqlite database
+    threadpool_size : max number of requests running their (blocking) database
+    work at the same time in the worker threadpool
+    db_readonly : open database.db read-only and immutable, for a database
+    built with create_database.py --bake
+    db_echo : log every SQL statement (True) and result row ("debug")
+    db_pool : connection pool class, "queue", "singleton", "static" or "null"
+    db_pool_size : connections kept by the queue and singleton pools,
+    defaults to threadpool_size
+    db_check_same_thread : sqlite3's check that a connection is only used by
+    the thread that opened it. Leave it off: the queue and static pools hand
+    connections to any threadpool worker, and disposing of a singleton pool
+    closes every thread's connection from one thread.
+    db_mmap_size, db_journal_mode, db_cache_size, db_temp_store : PRAGMAs set
+    on every new connection. None (or 0 for mmap_size) keeps sqlite's default.
+    response_cache : keep the rendered bytes of /dqm1/* GET responses in
+    memory, keyed by path and query parameters, and warm it at startup
+    response_cache_max_entries, response_cache_max_bytes : LRU bounds of the
+    response cache
+    http_max_age : seconds clients may reuse a /dqm1/* response before
+    revalidating it with its ETag
+    orjson : render JSON responses with orjson (optional dependency)
+    compression : gzip (or brotli, when installed) /dqm1/* responses for
+    clients that accept it
+    """
+
+    snapshot_mode: bool = False
+    threadpool_size: int = 40
+    db_readonly: bool = False
+    db_echo: Union[bool, str] = False
+    db_pool: str = "queue"
+    db_pool_size: Optional[int] = None
+    db_check_same_thread: bool = False
+    db_mmap_size: int = 0
+    db_journal_mode: Optional[str] = None
+    db_cache_size: Optional[int] = None
+    db_temp_store: Optional[str] = None
+    response_cache: bool = False
+    response_cache_max_entries: int = 1024
+    response_cache_max_bytes: int = 64 * 2**20
+    http_max_age: int = 0
+    orjson: bool = False
+    compression: bool = True
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        pool_size = _env_str("DQM_DB_POOL_SIZE")
+        cache_size = _env_str("DQM_DB_CACHE_SIZE")
+        return cls(
+            snapshot_mode=_env_bool("DQM_SNAPSHOT_MODE"),
+            threadpool_size=_env_int("DQM_THREADPOOL_SIZE", 40),
+            db_readonly=_env_bool("DQM_DB_READONLY"),
+            db_echo=_env_echo("DQM_DB_ECHO"),
+            db_pool=(_env_str("DQM_DB_POOL") or "queue").lower(),
+            db_pool_size=int(pool_size) if pool_size else None,
+            db_check_same_thread=_env_bool("DQM_DB_CHECK_SAME_THREAD"),
+            db_mmap_size=_env_int("DQM_DB_MMAP_SIZE", 0),
+            db_journal_mode=_env_str("DQM_DB_JOURNAL_MODE"),
+            db_cache_size=int(cache_size) if cache_size else None,
+            db_temp_store=_env_str("DQM_DB_TEMP_STORE"),
+            response_cache=_env_bool("DQM_RESPONSE_CACHE"),
+            response_cache_max_entries=_env_int("DQM_RESPONSE_CACHE_MAX_ENTRIES", 1024),
+            response_cache_max_bytes=_env_int(
+                "DQM_RESPONSE_CACHE_MAX_BYTES", 64 * 2**20
+            ),
+            http_max_age=_env_int("DQM_HTTP_MAX_AGE", 0),
+            orjson=_env_bool("DQM_ORJSON"),
+            compression=_env_bool("DQM_COMPRESSION", True),
+        )
+
+    @property
+    def db_pragmas(self) -> Dict[str, Union[str, int]]:
+        """
+        PRAGMAs to set on each new sqlite connection
+        """
+        pragmas: Dict[str, Union[str, int]] = {}
+        if self.db_journal_mode:
+            pragmas["journal_mode"] = self.db_journal_mode
+        if self.db_cache_size is not None:
+            pragmas["cache_size"] = self.db_cache_size
+        if self.db_mmap_size > 0:
+            pragmas["mmap_size"] = self.db_mmap_size
+        if self.db_temp_store:
+            pragmas["temp_store"] = self.db_temp_store
+        return pragmas
+
+
+settings = Settings.from_env()
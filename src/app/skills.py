@@ -0,0 +1,245 @@
+"""
+Precomputed skill relations: upgrade chains and which combo skills each skill
+helps unlock, for answering what a monster can eventually learn, and a
+column-oriented table of skill requirements for filtering skills by stats.
+"""
+
+from array import array
+from bisect import bisect_right
+from collections import defaultdict, deque
+from typing import Deque, Dict, Iterable, List, Optional, Set
+
+from sqlmodel import Session, col, select
+
+from src.app.models import (
+    LearnableSkill,
+    MonsterDetail,
+    MonsterSkillLink,
+    Skill,
+    SkillCombine,
+    SkillRead,
+    StatProfile,
+)
+
+
+class SkillGraph:
+    """
+    Upgrade chains and a reverse combo index (needed skill -> combo skills),
+    built once.
+
+    A combo skill is learned once every one of its needed skills is known,
+    and a known skill can be upgraded along its upgrade_to chain.
+    """
+
+    def __init__(
+        self,
+        skills: Iterable[Skill],
+        skill_combos: Iterable[SkillCombine],
+        monster_skills: Dict[int, List[int]],
+    ):
+        skills = list(skills)
+        self.skills: Dict[int, SkillRead] = {
+            skill.id: SkillRead.model_validate(skill)
+            for skill in skills
+            if skill.id is not None
+        }
+        self.monster_skills = {
+            monster_id: sorted(skill_ids)
+            for monster_id, skill_ids in monster_skills.items()
+        }
+
+        upgrade_to: Dict[int, int] = {
+            skill.id: skill.upgrade_to_id
+            for skill in skills
+            if skill.id is not None
+            and skill.upgrade_to_id is not None
+            and skill.upgrade_to_id != skill.id
+        }
+        # every later skill of the upgrade chain, nearest first
+        self.upgrades_after: Dict[int, List[int]] = {}
+        for skill_id in self.skills:
+            chain = []
+            next_id = upgrade_to.get(skill_id)
+            while next_id is not None and next_id != skill_id and next_id not in chain:
+                chain.append(next_id)
+                next_id = upgrade_to.get(next_id)
+            self.upgrades_after[skill_id] = chain
+
+        # the whole chain each skill is part of, from its first skill, shared
+        # by every skill of the chain
+        upgrade_from: Dict[int, int] = {
+            to_id: from_id for from_id, to_id in upgrade_to.items()
+        }
+        self.chains: Dict[int, List[int]] = {}
+        for skill_id in self.skills:
+            if skill_id in self.chains:
+                continue
+            first_id = skill_id
+            while upgrade_from.get(first_id, skill_id) != skill_id:
+                first_id = upgrade_from[first_id]
+            chain = [first_id, *self.upgrades_after[first_id]]
+            for chain_id in chain:
+                self.chains.setdefault(chain_id, chain)
+
+        needed: Dict[int, Set[int]] = defaultdict(set)
+        for combo in skill_combos:
+            if combo.combo_skill_id is None or combo.needed_skill_id is None:
+                continue
+            if combo.needed_skill_id != combo.combo_skill_id:
+                needed[combo.combo_skill_id].add(combo.needed_skill_id)
+        # skills each combo skill needs, and the reverse
+        self.combo_needs: Dict[int, List[int]] = {
+            combo_id: sorted(skill_ids) for combo_id, skill_ids in needed.items()
+        }
+        self.needed_for: Dict[int, List[int]] = defaultdict(list)
+        for combo_id, skill_ids in sorted(self.combo_needs.items()):
+            for skill_id in skill_ids:
+                self.needed_for[skill_id].append(combo_id)
+
+    @classmethod
+    def load(cls, session: Session) -> "SkillGraph":
+        monster_skills: Dict[int, List[int]] = {
+            monster_id: []
+            for monster_id in session.exec(select(MonsterDetail.id))
+            if monster_id is not None
+        }
+        for link in session.exec(select(MonsterSkillLink)):
+            if link.monster_id is not None and link.skill_id is not None:
+                monster_skills.setdefault(link.monster_id, []).append(link.skill_id)
+        return cls(
+            session.exec(select(Skill).order_by(col(Skill.id))).unique().all(),
+            session.exec(select(SkillCombine).order_by(col(SkillCombine.id))).all(),
+            monster_skills,
+        )
+
+    def chain(self, skill_id: int) -> List[SkillRead]:
+        """
+        the skills of skill_id's upgrade chain, in upgrade order
+        """
+        return [self.skills[chain_id] for chain_id in self.chains[skill_id]]
+
+    def learnable(
+        self, monster_id: int, inherited: Optional[Iterable[int]] = None
+    ) -> List[LearnableSkill]:
+        """
+        every skill a monster with its own skills and the inherited ones can
+        eventually learn, in the order they become reachable.
+
+        Forward chaining: each learned skill counts down the missing skills
+        of the combos that need it, so every combo is checked once per
+        needed skill.
+        """
+        learned: Dict[int, LearnableSkill] = {}
+        queue: Deque[int] = deque()
+        missing = {
+            combo_id: len(skill_ids) for combo_id, skill_ids in self.combo_needs.items()
+        }
+
+        def learn(skill_id: int, source: str, from_skill_ids: List[int]):
+            if skill_id in learned or skill_id not in self.skills:
+                return
+            learned[skill_id] = LearnableSkill(
+                skill=self.skills[skill_id],
+                source=source,
+                from_skill_ids=from_skill_ids,
+            )
+            queue.append(skill_id)
+
+        for skill_id in self.monster_skills.get(monster_id, []):
+            learn(skill_id, "natural", [])
+        for skill_id in inherited or []:
+            learn(skill_id, "inherited", [])
+
+        while queue:
+            skill_id = queue.popleft()
+            previous_id = skill_id
+            for upgrade_id in self.upgrades_after[skill_id]:
+                learn(upgrade_id, "upgrade", [previous_id])
+                previous_id = upgrade_id
+            for combo_id in self.needed_for.get(skill_id, []):
+                missing[combo_id] -= 1
+                if missing[combo_id] == 0:
+                    learn(combo_id, "combo", self.combo_needs[combo_id])
+
+        return list(learned.values())
+
+
+# StatProfile field -> Skill requirement column
+STAT_REQUIREMENTS = {
+    "level": "required_level",
+    "hp": "required_hp",
+    "mp": "required_mp",
+    "attack": "required_attack",
+    "defense": "required_defense",
+    "speed": "required_speed",
+    "intelligence": "required_intelligence",
+}
+
+
+class SkillRequirements:
+    """
+    Skill requirements stored by column, built once.
+
+    Each stat column is sorted, and prefix_masks[stat][k] is the bitset (bit
+    i = i-th skill by id) of the k skills needing the least of that stat. A
+    stat value then selects its eligible skills with one bisect, and a
+    profile is the AND of one bitset per stat, so every skill is checked in a
+    few integer operations. A missing requirement counts as 0.
+    """
+
+    def __init__(self, skills: Iterable[Skill]):
+        skills = sorted(skills, key=lambda skill: skill.id or 0)
+        self.skills: List[SkillRead] = [
+            SkillRead.model_validate(skill) for skill in skills
+        ]
+        self.all_mask = (1 << len(skills)) - 1
+        self.thresholds: Dict[str, "array[int]"] = {}
+        self.prefix_masks: Dict[str, List[int]] = {}
+        for stat, column in STAT_REQUIREMENTS.items():
+            required = array("l", (getattr(skill, column) or 0 for skill in skills))
+            order = sorted(range(len(skills)), key=required.__getitem__)
+            self.thresholds[stat] = array("l", (required[i] for i in order))
+            masks = [0]
+            for i in order:
+                masks.append(masks[-1] | 1 << i)
+            self.prefix_masks[stat] = masks
+
+    @classmethod
+    def load(cls, session: Session) -> "SkillRequirements":
+        return cls(session.exec(select(Skill).order_by(col(Skill.id))).unique().all())
+
+    def eligible_mask(self, profile: StatProfile) -> int:
+        """
+        bitset of the skills whose requirements profile meets. Stats left out
+        of profile are not checked.
+        """
+        mask = self.all_mask
+        for stat in STAT_REQUIREMENTS:
+            value = getattr(profile, stat)
+            if value is not None:
+                count = bisect_right(self.thresholds[stat], value)
+                mask &= self.prefix_masks[stat][count]
+        return mask
+
+    def _skills_in(self, mask: int) -> List[SkillRead]:
+        skills = []
+        while mask:
+            lowest = mask & -mask
+            skills.append(self.skills[lowest.bit_length() - 1])
+            mask ^= lowest
+        return skills
+
+    def eligible(self, profile: StatProfile) -> List[SkillRead]:
+        """
+        skills a monster with these stats can learn, by id
+        """
+        return self._skills_in(self.eligible_mask(profile))
+
+    def eligible_ids(self, profiles: Iterable[StatProfile]) -> List[List[int]]:
+        """
+        ids of the skills each profile can learn, in the order of profiles
+        """
+        return [
+            [skill.id for skill in self._skills_in(self.eligible_mask(profile))]
+            for profile in profiles
+        ]
@@ -0,0 +1,228 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, col, select
+
+from src.app.breeding import BreedingIndex, BreedingPlanner, BreedingReachability
+from src.app.model_enums import (
+    ItemCategory,
+    ItemSellLocation,
+    SkillCategory,
+    SkillFamily,
+)
+from src.app.models import (
+    Item,
+    MonsterBreedingLink,
+    MonsterDetail,
+    MonsterFamily,
+    Skill,
+    SkillCombine,
+)
+from src.app.search import AutocompleteIndex, SearchIndex
+from src.app.skills import SkillGraph, SkillRequirements
+from src.app.sprites import MonsterSpriteIndex
+
+FilterKey = Tuple[Optional[str], Optional[str]]
+
+
+def _filter_keys(first: str, second: str) -> List[FilterKey]:
+    """
+    every (first, second) filter combination a row should be listed under.
+    None means the filter was not given in the request.
+    """
+    return [(None, None), (first, None), (None, second), (first, second)]
+
+
+class Snapshot:
+    """
+    Read-only, in-memory copy of the whole DQM1 dataset.
+
+    The data never changes at runtime, so every row (with the relationships
+    the response models need) is loaded once and indexed by the lookups the
+    /dqm1/* routes make. Each method mirrors the query of the route with the
+    same name in main.py and returns the same ORM objects.
+    """
+
+    def __init__(
+        self,
+        families: List[MonsterFamily],
+        monsters: List[MonsterDetail],
+        skills: List[Skill],
+        skill_combos: List[SkillCombine],
+        breeding_links: List[MonsterBreedingLink],
+        items: List[Item],
+        family_parents: Optional[List[Tuple[int, int]]] = None,
+    ):
+        self.families_by_id: Dict[int, MonsterFamily] = {
+            family.id: family for family in families if family.id is not None
+        }
+        self.monsters_by_id: Dict[int, MonsterDetail] = {
+            monster.id: monster for monster in monsters if monster.id is not None
+        }
+        self.monsters_by_family: Dict[int, List[MonsterDetail]] = defaultdict(list)
+        for monster in monsters:
+            self.monsters_by_family[monster.family_id].append(monster)
+
+        self.skills_by_id: Dict[int, Skill] = {
+            skill.id: skill for skill in skills if skill.id is not None
+        }
+        self.skills_by_filter: Dict[FilterKey, List[Skill]] = defaultdict(list)
+        for skill in skills:
+            for key in _filter_keys(skill.category_type, skill.family_type):
+                self.skills_by_filter[key].append(skill)
+
+        self.skill_combos_by_combo: Dict[int, List[SkillCombine]] = defaultdict(list)
+        for combo in skill_combos:
+            if combo.combo_skill_id is not None:
+                self.skill_combos_by_combo[combo.combo_skill_id].append(combo)
+        self.skill_requirements = SkillRequirements(skills)
+        self.skill_graph = SkillGraph(
+            skills,
+            skill_combos,
+            {
+                monster.id: [
+                    skill.id for skill in monster.skills if skill.id is not None
+                ]
+                for monster in monsters
+                if monster.id is not None
+            },
+        )
+
+        self.breeding_index = BreedingIndex(breeding_links, family_parents or [])
+        self.breeding_planner = BreedingPlanner(breeding_links, monsters)
+        self.breeding_reachability = BreedingReachability(breeding_links, monsters)
+        self.sprite_index = MonsterSpriteIndex(
+            (monster.id, monster.old_name)
+            for monster in monsters
+            if monster.id is not None
+        )
+
+        self.items_by_id: Dict[int, Item] = {
+            item.id: item for item in items if item.id is not None
+        }
+        self.items_by_filter: Dict[FilterKey, List[Item]] = defaultdict(list)
+        for item in items:
+            for key in _filter_keys(item.item_category, item.sell_location):
+                self.items_by_filter[key].append(item)
+
+        self.search_index = SearchIndex.from_rows(monsters, skills, items)
+        self.autocomplete_index = AutocompleteIndex.from_rows(monsters, skills)
+
+    @classmethod
+    def load(cls, session: Session) -> "Snapshot":
+        """
+        Reads every table with eager loading so no relationship is left to
+        lazy load once the session is closed.
+
+        Skills are read first with selectin loading of their upgrades, so
+        every skill is a primary row with upgrade_to/upgrade_from populated
+        (the default self-join stops one level deep). Skills reached later
+        through MonsterDetail.skills and SkillCombine come from the identity
+        map.
+        """
+        skills = session.exec(
+            select(Skill)
+            .options(
+                selectinload(Skill.upgrade_to),  # type: ignore[arg-type]
+                selectinload(Skill.upgrade_from),  # type: ignore[arg-type]
+            )
+            .order_by(col(Skill.id))
+        ).all()
+        families = session.exec(
+            select(MonsterFamily)
+            .options(selectinload(MonsterFamily.monsters))  # type: ignore[arg-type]
+            .order_by(col(MonsterFamily.id))
+        ).all()
+        monsters = session.exec(
+            select(MonsterDetail)
+            .options(
+                selectinload(MonsterDetail.family),  # type: ignore[arg-type]
+                selectinload(MonsterDetail.skills),  # type: ignore[arg-type]
+            )
+            .order_by(col(MonsterDetail.id))
+        ).all()
+        skill_combos = session.exec(
+            select(SkillCombine).order_by(col(SkillCombine.id))
+        ).all()
+        breeding_links = session.exec(
+            select(MonsterBreedingLink).order_by(col(MonsterBreedingLink.id))
+        ).all()
+        items = session.exec(select(Item).order_by(col(Item.id))).all()
+
+        return cls(
+            families=list(families),
+            monsters=list(monsters),
+            skills=list(skills),
+            skill_combos=list(skill_combos),
+            breeding_links=list(breeding_links),
+            items=list(items),
+            family_parents=BreedingIndex.load_family_parents(session),
+        )
+
+    def read_monsters(self, family: Optional[int] = None) -> List[MonsterDetail]:
+        if family:
+            return self.monsters_by_family.get(family, [])
+        return list(self.monsters_by_id.values())
+
+    def read_monsters_by_id(
+        self, monster_ids: List[int], family: Optional[int] = None
+    ) -> List[MonsterDetail]:
+        monsters = (self.monsters_by_id.get(monster_id) for monster_id in monster_ids)
+        return [
+            monster
+            for monster in monsters
+            if monster is not None and (not family or monster.family_id == family)
+        ]
+
+    def read_monster(self, monster_id: int) -> Optional[MonsterDetail]:
+        return self.monsters_by_id.get(monster_id)
+
+    def read_family(self, family_id: int) -> Optional[MonsterFamily]:
+        return self.families_by_id.get(family_id)
+
+    def read_skills(
+        self,
+        category: Optional[SkillCategory] = None,
+        skill_family: Optional[SkillFamily] = None,
+    ) -> List[Skill]:
+        key = (
+            category.value if category else None,
+            skill_family.value if skill_family else None,
+        )
+        return self.skills_by_filter.get(key, [])
+
+    def read_skills_by_id(
+        self,
+        skill_ids: List[int],
+        category: Optional[SkillCategory] = None,
+        skill_family: Optional[SkillFamily] = None,
+    ) -> List[Skill]:
+        skills = (self.skills_by_id.get(skill_id) for skill_id in skill_ids)
+        return [
+            skill
+            for skill in skills
+            if skill is not None
+            and (not category or skill.category_type == category.value)
+            and (not skill_family or skill.family_type == skill_family.value)
+        ]
+
+    def read_skill(self, skill_id: int) -> Optional[Skill]:
+        return self.skills_by_id.get(skill_id)
+
+    def get_skill_combo(self, skill_id: int) -> List[SkillCombine]:
+        return self.skill_combos_by_combo.get(skill_id, [])
+
+    def read_items(
+        self,
+        category: Optional[ItemCategory] = None,
+        selllocation: Optional[ItemSellLocation] = None,
+    ) -> List[Item]:
+        key = (
+            category.value if category else None,
+            selllocation.value if selllocation else None,
+        )
+        return self.items_by_filter.get(key, [])
+
+    def read_item(self, item_id: int) -> Optional[Item]:
+        return self.items_by_id.get(item_id)
@@ -0,0 +1,385 @@
+"""
+In-memory store of the monster sprites, served at content-hashed URLs.
+
+/sprites/{hash}/{file name} never changes (a new image gets a new hash), so
+it is sent with a far-future, immutable Cache-Control. /sprites/{file name}
+redirects to the current hashed URL. Range requests are supported.
+"""
+
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+from urllib.parse import quote
+
+from sqlmodel import Session, col, select
+from starlette.concurrency import run_in_threadpool
+
+from src.app.compression import get_header
+from src.app.conditional import etag_matches
+from src.app.database import project_dir
+from src.app.models import (
+    MissingSprite,
+    MonsterDetail,
+    MonsterSprite,
+    SpriteAtlas,
+    SpriteFrame,
+)
+from src.app.png import PngImage, read_png, read_size, write_png
+
+SPRITE_DIR = project_dir / "static/images/dqm1monsters"
+IMMUTABLE_CACHE_CONTROL = b"public, max-age=31536000, immutable"
+# atlases kept per MonsterSpriteIndex, least recently used dropped first
+MAX_ATLASES = 32
+
+AtlasKey = Optional[Tuple[int, ...]]
+
+
+class Sprite(NamedTuple):
+    name: str
+    data: bytes
+    content_hash: str
+    content_type: str
+    width: int
+    height: int
+
+    @property
+    def url(self) -> str:
+        return f"/sprites/{self.content_hash}/{quote(self.name)}"
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.content_hash}"'
+
+
+class SpriteStore:
+    """
+    every .png file of a folder, read once and kept in memory
+    """
+
+    def __init__(self, sprites: Dict[str, Sprite]):
+        self.sprites = sprites
+        self._by_lower_name = {name.lower(): sprite for name, sprite in sprites.items()}
+        self._monster_sprites: Dict[str, Optional[MonsterSprite]] = {}
+
+    @classmethod
+    def from_directory(cls, directory: Union[str, Path]) -> "SpriteStore":
+        store = cls({})
+        for path in sorted(Path(directory).glob("*.png")):
+            store.add(path.name, path.read_bytes())
+        return store
+
+    def add(self, name: str, data: bytes) -> Sprite:
+        width, height = read_size(data)
+        sprite = Sprite(
+            name=name,
+            data=data,
+            content_hash=hashlib.sha256(data).hexdigest()[:16],
+            content_type="image/png",
+            width=width,
+            height=height,
+        )
+        self.sprites[name] = sprite
+        self._by_lower_name[name.lower()] = sprite
+        return sprite
+
+    def remove(self, name: str):
+        self.sprites.pop(name, None)
+        self._by_lower_name.pop(name.lower(), None)
+
+    def get(self, name: str) -> Optional[Sprite]:
+        return self.sprites.get(name)
+
+    def find(self, old_name: str) -> Optional[Sprite]:
+        """
+        the sprite of a monster: the file named after its old_name
+        (e.g. AgDevil.png), compared case-insensitively when there is no
+        exact match
+        """
+        file_name = f"{old_name}.png"
+        return self.sprites.get(file_name) or self._by_lower_name.get(file_name.lower())
+
+    def monster_sprite(self, old_name: str) -> Optional[MonsterSprite]:
+        """
+        sprite metadata for monster responses, made once per old_name
+        """
+        if old_name not in self._monster_sprites:
+            sprite = self.find(old_name)
+            if sprite is None:
+                self._monster_sprites[old_name] = None
+            else:
+                self._monster_sprites[old_name] = MonsterSprite(
+                    image_url=sprite.url,
+                    width=sprite.width,
+                    height=sprite.height,
+                    content_hash=sprite.content_hash,
+                )
+        return self._monster_sprites[old_name]
+
+    def url(self, name: str) -> Optional[str]:
+        sprite = self.sprites.get(name)
+        return sprite.url if sprite else None
+
+
+sprite_store = SpriteStore.from_directory(SPRITE_DIR)
+
+
+def pack_atlas(images: Dict[int, PngImage]) -> Tuple[PngImage, Dict[int, SpriteFrame]]:
+    """
+    lays images out on a grid of equal cells, the size of the largest image,
+    as close to square as possible. Each image sits in the top left corner
+    of its cell and the rest of the cell is left black (or transparent).
+    """
+    color_types = {image.color_type for image in images.values()}
+    if len(color_types) > 1:
+        raise ValueError("all images of an atlas must have the same color type")
+    color_type = color_types.pop() if color_types else 2
+    channels = PngImage(0, 0, color_type, []).channels
+    cell_width = max((image.width for image in images.values()), default=1)
+    cell_height = max((image.height for image in images.values()), default=1)
+    columns = max(math.ceil(math.sqrt(len(images))), 1)
+    grid_rows = max(math.ceil(len(images) / columns), 1)
+
+    frames: Dict[int, SpriteFrame] = {}
+    ordered = list(images.items())
+    blank_cell_row = bytes(cell_width * channels)
+    rows: List[bytes] = []
+    for grid_row in range(grid_rows):
+        cells = ordered[grid_row * columns : (grid_row + 1) * columns]
+        for column, (key, image) in enumerate(cells):
+            frames[key] = SpriteFrame(
+                x=column * cell_width,
+                y=grid_row * cell_height,
+                width=image.width,
+                height=image.height,
+            )
+        for y in range(cell_height):
+            parts = []
+            for _, image in cells:
+                line = image.rows[y] if y < image.height else b""
+                parts.append(line + blank_cell_row[len(line) :])
+            parts.append(blank_cell_row * (columns - len(cells)))
+            rows.append(b"".join(parts))
+    atlas = PngImage(columns * cell_width, grid_rows * cell_height, color_type, rows)
+    return atlas, frames
+
+
+def _atlas_name(key: AtlasKey) -> str:
+    if key is None:
+        return "atlas.png"
+    return f"atlas-{'-'.join(map(str, key))}.png"
+
+
+def atlas_monster_ids(name: str) -> AtlasKey:
+    """
+    monster ids of an atlas image name, None for the atlas of every monster.
+    Raises ValueError for other names, including names MonsterSpriteIndex
+    never gives an atlas (atlas-5-1.png, atlas-01.png), so no atlas is built
+    for them.
+    """
+    if name == "atlas.png":
+        return None
+    if not (name.startswith("atlas-") and name.endswith(".png")):
+        raise ValueError(f"{name!r} is not an atlas image")
+    try:
+        key = tuple(int(part) for part in name[len("atlas-") : -len(".png")].split("-"))
+    except ValueError:
+        raise ValueError(f"{name!r} is not an atlas image") from None
+    if key != tuple(sorted(set(key))) or _atlas_name(key) != name:
+        raise ValueError(f"{name!r} is not an atlas image")
+    return key
+
+
+class MonsterSpriteIndex:
+    """
+    Sprite of each monster (SpriteStore.find), built once, and the monsters
+    without one.
+
+    Atlases packing several sprites into one image are built on request and
+    kept for later requests for the same monsters. An atlas image is named
+    after its monster ids (atlas-1-5-9.png, atlas.png for every monster), so
+    a worker process that did not build it can rebuild it from the URL.
+    """
+
+    def __init__(
+        self, monsters: Iterable[Tuple[int, str]], store: SpriteStore = sprite_store
+    ):
+        self.store = store
+        self.sprites: Dict[int, Sprite] = {}
+        self.missing: List[MissingSprite] = []
+        for monster_id, old_name in monsters:
+            sprite = store.find(old_name)
+            if sprite is None:
+                self.missing.append(
+                    MissingSprite(
+                        monster_id=monster_id,
+                        old_name=old_name,
+                        expected_file=f"{old_name}.png",
+                    )
+                )
+            else:
+                self.sprites[monster_id] = sprite
+
+        self._atlases: "OrderedDict[AtlasKey, SpriteAtlas]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, session: Session) -> "MonsterSpriteIndex":
+        rows = session.exec(
+            select(MonsterDetail.id, MonsterDetail.old_name).order_by(
+                col(MonsterDetail.id)
+            )
+        )
+        return cls(
+            (monster_id, old_name)
+            for monster_id, old_name in rows
+            if monster_id is not None
+        )
+
+    def atlas(self, monster_ids: Optional[Iterable[int]] = None) -> SpriteAtlas:
+        """
+        atlas of the given monsters' sprites in id order, or of every sprite
+        """
+        key = None if monster_ids is None else tuple(sorted(set(monster_ids)))
+        with self._lock:
+            atlas = self._atlases.get(key)
+            if atlas is not None:
+                self._atlases.move_to_end(key)
+                return atlas
+            atlas = self._atlases[key] = self._build_atlas(key)
+            while len(self._atlases) > MAX_ATLASES:
+                evicted_key, _ = self._atlases.popitem(last=False)
+                self.store.remove(_atlas_name(evicted_key))
+            return atlas
+
+    def _build_atlas(self, key: AtlasKey) -> SpriteAtlas:
+        name = _atlas_name(key)
+        monster_ids = tuple(sorted(self.sprites)) if key is None else key
+        images = {
+            monster_id: read_png(self.sprites[monster_id].data)
+            for monster_id in monster_ids
+            if monster_id in self.sprites
+        }
+        image, frames = pack_atlas(images)
+        sprite = self.store.add(name, write_png(image))
+        return SpriteAtlas(
+            image_url=sprite.url,
+            width=image.width,
+            height=image.height,
+            frames=frames,
+            missing=[id for id in monster_ids if id not in self.sprites],
+        )
+
+
+def parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    (first, last) byte positions of a single "bytes=" range, clamped to the
+    body. Raises ValueError when the range cannot be satisfied. Returns None
+    for headers that are ignored (other units, several ranges), in which
+    case the whole body is sent.
+    """
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+    first, _, last = ranges.strip().partition("-")
+    try:
+        if first == "":
+            # suffix range: the last n bytes
+            length = int(last)
+            if length <= 0:
+                raise ValueError("empty suffix range")
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        raise ValueError(f"invalid range {range_header!r}")
+    if start >= size or end < start:
+        raise ValueError(f"range {range_header!r} outside of {size} bytes")
+    return start, min(end, size - 1)
+
+
+class SpriteFiles:
+    """
+    ASGI app serving a SpriteStore, mounted like StaticFiles.
+    build_missing is called (in the threadpool) with the file name of a
+    sprite that is not in the store, and may create it.
+    """
+
+    def __init__(
+        self,
+        store: SpriteStore,
+        build_missing: Optional[Callable[[str], Optional[Sprite]]] = None,
+    ):
+        self.store = store
+        self.build_missing = build_missing
+
+    async def __call__(self, scope, receive, send):
+        assert scope["type"] == "http"
+        if scope["method"] not in ("GET", "HEAD"):
+            await self._send(send, scope, 405, [(b"allow", b"GET, HEAD")])
+            return
+
+        path = scope["path"][len(scope.get("root_path", "")) :].lstrip("/")
+        content_hash, _, name = path.rpartition("/")
+        sprite = self.store.get(name)
+        if sprite is None and self.build_missing is not None:
+            sprite = await run_in_threadpool(self.build_missing, name)
+        if sprite is None or content_hash not in ("", sprite.content_hash):
+            await self._send(send, scope, 404, [], b"Not Found")
+            return
+        if content_hash == "":
+            # unversioned name: point at the URL for the current content
+            location = scope.get("root_path", "") + "/" + quote(sprite.content_hash)
+            location += "/" + quote(sprite.name)
+            headers = [
+                (b"location", location.encode()),
+                (b"cache-control", b"no-cache"),
+            ]
+            await self._send(send, scope, 307, headers)
+            return
+
+        headers = [
+            (b"content-type", sprite.content_type.encode()),
+            (b"cache-control", IMMUTABLE_CACHE_CONTROL),
+            (b"etag", sprite.etag.encode()),
+            (b"accept-ranges", b"bytes"),
+        ]
+        request_headers = scope["headers"]
+        if_none_match = get_header(request_headers, b"if-none-match")
+        if if_none_match is not None and etag_matches(
+            sprite.etag, if_none_match.decode()
+        ):
+            await self._send(send, scope, 304, headers)
+            return
+
+        data = sprite.data
+        range_header = get_header(request_headers, b"range")
+        if range_header is not None:
+            size = len(data)
+            try:
+                byte_range = parse_range(range_header.decode(), size)
+            except ValueError:
+                headers.append((b"content-range", f"bytes */{size}".encode()))
+                await self._send(send, scope, 416, headers)
+                return
+            if byte_range is not None:
+                first, last = byte_range
+                headers.append(
+                    (b"content-range", f"bytes {first}-{last}/{size}".encode())
+                )
+                await self._send(send, scope, 206, headers, data[first : last + 1])
+                return
+        await self._send(send, scope, 200, headers, data)
+
+    @staticmethod
+    async def _send(send, scope, status: int, headers, body: bytes = b""):
+        if status != 304:
+            headers = headers + [(b"content-length", str(len(body)).encode())]
+        await send(
+            {"type": "http.response.start", "status": status, "headers": headers}
+        )
+        if scope["method"] == "HEAD":
+            body = b""
+        await send({"type": "http.response.body", "body": body})
@@ -1,11 +1,14 @@
 import csv
+from contextlib import contextmanager
 from pathlib import Path
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlmodel import Session, SQLModel, create_engine
 from sqlmodel.pool import StaticPool
 
+from src.app.create_database import expand_family_breeding
 from src.app.main import app, get_session
 from src.app.models import (
     Item,
@@ -95,3 +98,31 @@ def load_csv_data(session_module: Session):
             session_module.commit()
         except Exception as e:
             print(f"Error loading {csvfile} : {e}")
+
+    expand_family_breeding(session_module.get_bind().engine)
+
+
+@pytest.fixture(name="count_queries")
+def count_queries_fixture():
+    """
+    context manager counting the SQL statements sent through an engine:
+
+    with count_queries(engine) as queries:
+        ...
+    assert len(queries) == 1
+    """
+
+    @contextmanager
+    def count_queries(engine):
+        queries = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            queries.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield queries
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    return count_queries
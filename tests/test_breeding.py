@@ -0,0 +1,261 @@
+import pytest
+from sqlmodel import col, select
+
+from src.app.breeding import BreedingIndex, BreedingPlanner, BreedingReachability
+from src.app.models import MonsterBreedingLink, MonsterDetail
+
+
+@pytest.fixture(name="breeding_index", scope="module")
+def breeding_index_fixture(session_module, load_all_csvdata):
+    return BreedingIndex.load(session_module)
+
+
+@pytest.mark.parametrize("monster_id", [1, 5, 110, 215, 999])
+def test_breeding_index_matches_query(session_module, breeding_index, monster_id):
+    """
+    The index returns the same combinations, in the same order, as the OR
+    query over child_id, pedigree_id and parent2_id.
+    """
+    query = (
+        select(MonsterBreedingLink)
+        .where(
+            (MonsterBreedingLink.child_id == monster_id)
+            | (MonsterBreedingLink.pedigree_id == monster_id)
+            | (MonsterBreedingLink.parent2_id == monster_id)
+        )
+        .order_by(col(MonsterBreedingLink.id))
+    )
+    expected = [link.id for link in session_module.exec(query).all()]
+
+    assert [link.id for link in breeding_index.combos(monster_id)] == expected
+
+
+def test_breeding_index_slots(breeding_index):
+    """
+    Each per-slot list only holds combinations using the monster in that slot.
+    """
+    monster_id = 5
+    assert all(link.child_id == monster_id for link in breeding_index.as_child[5])
+    assert all(link.pedigree_id == monster_id for link in breeding_index.as_pedigree[5])
+    assert all(link.parent2_id == monster_id for link in breeding_index.as_parent2[5])
+
+
+def test_breeding_index_lists_combo_once():
+    """
+    A monster bred with itself appears once in its combination list.
+    """
+    link = MonsterBreedingLink(id=1, child_id=3, pedigree_id=2, parent2_id=2)
+    breeding_index = BreedingIndex([link])
+
+    assert breeding_index.combos(2) == [link]
+    assert breeding_index.as_pedigree[2] == [link]
+    assert breeding_index.as_parent2[2] == [link]
+
+
+def test_breeding_index_family_parents():
+    """
+    include_family adds the combinations a monster joins through its family.
+    """
+    concrete = MonsterBreedingLink(id=2, child_id=4, pedigree_id=1, parent2_id=3)
+    family = MonsterBreedingLink(id=1, child_id=5, pedigree_id=2, family2_id=7)
+    breeding_index = BreedingIndex([concrete, family], [(1, 1), (1, 6), (1, 1)])
+
+    assert breeding_index.combos(1) == [concrete]
+    assert breeding_index.combos(1, include_family=True) == [family, concrete]
+    assert breeding_index.combos(6, include_family=True) == [family]
+    assert breeding_index.combos(3, include_family=True) == [concrete]
+    assert breeding_index.as_family_parent[1] == [family]
+
+
+def test_breeding_index_without_expansion_table(session, caplog):
+    """
+    A database made before the expansion table still loads, without family
+    parents, and the log says how to add the table.
+    """
+    link = MonsterBreedingLink(id=1, child_id=5, pedigree_id=2, family2_id=7)
+    session.add(link)
+    session.commit()
+    session.connection().exec_driver_sql("DROP TABLE monsterbreedingexpansion")
+
+    breeding_index = BreedingIndex.load(session)
+
+    assert [combo.id for combo in breeding_index.combos(5)] == [1]
+    assert breeding_index.as_family_parent == {}
+    assert "--expand-families" in caplog.text
+
+
+def test_get_breeding_combos_include_family(
+    client_module, session_module, load_all_csvdata
+):
+    monster = session_module.get(MonsterDetail, 110)
+    combos = client_module.get("dqm1/breeding/110").json()
+    response = client_module.get("dqm1/breeding/110", params={"include_family": "true"})
+    with_family = response.json()
+
+    assert response.status_code == 200
+    assert [combo["id"] for combo in with_family] == sorted(
+        combo["id"] for combo in with_family
+    )
+    assert {combo["id"] for combo in combos} < {combo["id"] for combo in with_family}
+    for combo in with_family:
+        if combo not in combos:
+            assert monster.family_id in (
+                combo["pedigree_family_id"],
+                combo["family2_id"],
+            )
+
+
+def test_get_breeding_combos(client_module, load_all_csvdata):
+    response = client_module.get("dqm1/breeding/110")
+    combos = response.json()
+
+    assert response.status_code == 200
+    assert combos
+    assert all(
+        110 in (combo["child_id"], combo["pedigree_id"], combo["parent2_id"])
+        for combo in combos
+    )
+    assert [combo["id"] for combo in combos] == sorted(c["id"] for c in combos)
+
+
+def _small_graph():
+    """
+    small breeding graph:
+    3 = 1 + 2, 4 = 3 + any family 1 monster, 5 = 4 + 2, 5 = 1 + 6
+    """
+    monsters = [
+        MonsterDetail(
+            id=i, new_name=f"m{i}", old_name=f"m{i}", description="", family_id=family
+        )
+        for i, family in [(1, 1), (2, 2), (3, 3), (4, 3), (5, 3), (6, 1)]
+    ]
+    links = [
+        MonsterBreedingLink(id=1, child_id=3, pedigree_id=1, parent2_id=2),
+        MonsterBreedingLink(id=2, child_id=4, pedigree_id=3, family2_id=1),
+        MonsterBreedingLink(id=3, child_id=5, pedigree_id=4, parent2_id=2),
+        MonsterBreedingLink(id=4, child_id=5, pedigree_id=1, parent2_id=6),
+    ]
+    return links, monsters
+
+
+def _planner():
+    return BreedingPlanner(*_small_graph())
+
+
+def test_breeding_planner_family_slot():
+    """
+    Family slots are filled by any monster of that family.
+    """
+    plan = _planner().plan(target_id=4, roster=[1, 2], max_depth=5)
+
+    assert plan.breedings == 2
+    assert plan.generations == 2
+    assert plan.plan.combo_id == 2
+    assert plan.plan.pedigree.monster_id == 3
+    assert plan.plan.parent2.monster_id == 1
+    assert plan.plan.parent2.combo_id is None
+
+
+def test_breeding_planner_depth_limit():
+    planner = _planner()
+
+    assert planner.plan(target_id=5, roster=[1, 2], max_depth=2) is None
+    assert planner.plan(target_id=5, roster=[1, 2], max_depth=3).breedings == 3
+
+
+def test_breeding_planner_cheapest():
+    """
+    The cheapest tree wins over a deeper one, and roster monsters need no
+    breeding.
+    """
+    planner = _planner()
+
+    assert planner.plan(target_id=5, roster=[1, 2, 6], max_depth=5).breedings == 1
+    assert planner.plan(target_id=1, roster=[1], max_depth=5).breedings == 0
+
+
+def _check_plan_node(node, roster, links_by_id, family_of):
+    if node["combo_id"] is None:
+        assert node["monster_id"] in roster
+        return
+    link = links_by_id[node["combo_id"]]
+    assert link.child_id == node["monster_id"]
+    for parent, monster_id, family_id in [
+        (node["pedigree"], link.pedigree_id, link.pedigree_family_id),
+        (node["parent2"], link.parent2_id, link.family2_id),
+    ]:
+        if monster_id is not None:
+            assert parent["monster_id"] == monster_id
+        else:
+            assert family_of[parent["monster_id"]] == family_id
+        _check_plan_node(parent, roster, links_by_id, family_of)
+
+
+def test_get_breeding_plan(client_module, session_module, load_all_csvdata):
+    """
+    Every step of the returned plan is a real breeding combination.
+    """
+    roster = list(range(1, 60))
+    response = client_module.get(
+        "dqm1/breeding/plan",
+        params={"target": 200, "roster": ",".join(map(str, roster))},
+    )
+    plan = response.json()
+
+    links_by_id = {
+        link.id: link for link in session_module.exec(select(MonsterBreedingLink))
+    }
+    family_of = {
+        monster.id: monster.family_id
+        for monster in session_module.exec(select(MonsterDetail))
+    }
+
+    assert response.status_code == 200
+    assert plan["target_id"] == 200
+    assert plan["plan"]["old_name"] == "GoldGolem"
+    assert plan["generations"] <= 4
+    _check_plan_node(plan["plan"], roster, links_by_id, family_of)
+
+
+def test_get_breeding_plan_fail(client_module, load_all_csvdata):
+    response = client_module.get("dqm1/breeding/plan?target=999&roster=1,2")
+    assert response.status_code == 404
+
+    response = client_module.get("dqm1/breeding/plan?target=200&roster=1,2&max_depth=1")
+    assert response.status_code == 404
+
+    response = client_module.get("dqm1/breeding/plan?target=200&roster=1,x")
+    assert response.status_code == 422
+
+
+def test_breeding_reachability():
+    reachability = BreedingReachability(*_small_graph())
+
+    assert reachability.reachable([1, 2]) == [1, 2, 3, 4, 5]
+    # 6 fills the family 1 slot of 4 = 3 + family 1
+    assert reachability.reachable([2, 3, 6]) == [2, 3, 4, 5, 6]
+    assert reachability.reachable([1, 3]) == [1, 3, 4]
+    assert reachability.reachable([2]) == [2]
+
+
+def test_get_breeding_reachable(client_module, load_all_csvdata):
+    roster = list(range(1, 40, 3))
+    roster_param = ",".join(map(str, reversed(roster)))
+    response = client_module.get(
+        "dqm1/breeding/reachable", params={"roster": roster_param}
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["roster"] == roster
+    assert set(roster) < set(result["reachable"])
+
+    # every reachable monster has a breeding plan from the roster
+    for target in set(result["reachable"]) - set(roster):
+        plan = client_module.get(
+            "dqm1/breeding/plan",
+            params={"target": target, "roster": roster_param, "max_depth": 10},
+        )
+        assert plan.status_code == 200
+
+    response = client_module.get("dqm1/breeding/reachable", params={"roster": "999"})
+    assert response.status_code == 404
@@ -0,0 +1,49 @@
+import gzip
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.app.compression import compress, negotiate_encoding
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, encodings, expected",
+    [
+        ("gzip, deflate, br", ["br", "gzip"], "br"),
+        ("gzip, deflate, br", ["gzip"], "gzip"),
+        ("br;q=0.5, gzip", ["br", "gzip"], "gzip"),
+        ("gzip;q=0", ["gzip"], None),
+        ("identity", ["br", "gzip"], None),
+        ("*", ["br", "gzip"], "br"),
+        ("", ["gzip"], None),
+    ],
+)
+def test_negotiate_encoding(accept_encoding, encodings, expected):
+    assert negotiate_encoding(accept_encoding, encodings) == expected
+
+
+def test_gzip_is_deterministic():
+    body = b'{"id":1,"name":"Herb"}' * 50
+    assert compress(body, "gzip") == compress(body, "gzip")
+    assert gzip.decompress(compress(body, "gzip", best=True)) == body
+
+
+def test_large_json_responses_are_gzipped(client_module: TestClient, load_all_csvdata):
+    identity = client_module.get(
+        "/dqm1/monsters", headers={"Accept-Encoding": "identity"}
+    )
+    gzipped = client_module.get("/dqm1/monsters", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in identity.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["vary"] == "Accept-Encoding"
+    assert int(gzipped.headers["content-length"]) < len(identity.content)
+    assert gzipped.json() == identity.json()
+    assert gzipped.headers["etag"] != identity.headers["etag"]
+
+
+def test_small_responses_are_not_compressed(client_module: TestClient):
+    response = client_module.get(
+        "/dqm1/monsters/999", headers={"Accept-Encoding": "gzip"}
+    )
+    assert "content-encoding" not in response.headers
@@ -0,0 +1,103 @@
+from fastapi.testclient import TestClient
+
+from src.app.conditional import dataset_version, etag_matches, make_etag
+
+
+def test_dataset_version_changes_with_file_contents(tmp_path):
+    csv_file = tmp_path / "DQM1_items.csv"
+    csv_file.write_text("id,name\n1,Herb\n")
+    first = dataset_version([csv_file])
+    assert dataset_version([csv_file]) == first
+
+    csv_file.write_text("id,name\n1,Herb\n2,Antidote\n")
+    assert dataset_version([csv_file]) != first
+
+
+def test_dataset_version_changes_with_app_version(tmp_path):
+    csv_file = tmp_path / "DQM1_items.csv"
+    csv_file.write_text("id,name\n1,Herb\n")
+
+    assert dataset_version([csv_file], "1.0.0") != dataset_version([csv_file], "1.1.0")
+
+
+def test_etag_ignores_query_parameter_order():
+    assert make_etag("v1", "/dqm1/items", b"a=1&b=2") == make_etag(
+        "v1", "/dqm1/items", b"b=2&a=1"
+    )
+    assert make_etag("v1", "/dqm1/items", b"") != make_etag("v2", "/dqm1/items", b"")
+    assert make_etag("v1", "/dqm1/items", b"") != make_etag("v1", "/dqm1/skills", b"")
+
+
+def test_etag_matches_lists_and_weak_tags():
+    assert etag_matches('"abc"', '"xyz", W/"abc"')
+    assert not etag_matches('"abc"', "*")
+    assert not etag_matches('"abc"', '"xyz"')
+
+
+def test_responses_carry_etag_and_cache_control(client: TestClient):
+    response = client.get("/dqm1/monsters")
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert "etag" not in client.get("/dqm1/monsters/999").headers
+    assert "etag" not in client.get("/").headers
+
+
+def test_matching_if_none_match_returns_304_without_querying(
+    client: TestClient, session, count_queries
+):
+    etag = client.get("/dqm1/skills").headers["etag"]
+
+    with count_queries(session.get_bind()) as queries:
+        response = client.get("/dqm1/skills", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert queries == []
+
+
+def test_stale_if_none_match_returns_full_response(client: TestClient):
+    response = client.get("/dqm1/skills", headers={"If-None-Match": '"stale"'})
+
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_if_none_match_any_returns_304_for_existing_url(client: TestClient):
+    response = client.get("/dqm1/skills", headers={"If-None-Match": "*"})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == client.get("/dqm1/skills").headers["etag"]
+
+
+def test_if_none_match_any_keeps_errors(client: TestClient):
+    """
+    "*" only matches a URL that has a representation, so errors go through.
+    """
+    missing = client.get("/dqm1/monsters/999", headers={"If-None-Match": "*"})
+    unknown = client.get("/dqm1/nonexistent/route", headers={"If-None-Match": "*"})
+
+    assert missing.status_code == 404
+    assert missing.json() == {"detail": "Monster not found"}
+    assert unknown.status_code == 404
+
+
+def test_not_modified_varies_on_accept_encoding(client: TestClient):
+    """
+    The 304 carries the same Vary: Accept-Encoding as the 200.
+    """
+    headers = {"Accept-Encoding": "gzip"}
+    response = client.get("/dqm1/skills", headers=headers)
+    not_modified = client.get(
+        "/dqm1/skills", headers={**headers, "If-None-Match": response.headers["etag"]}
+    )
+    any_match = client.get("/dqm1/skills", headers={**headers, "If-None-Match": "*"})
+
+    assert response.headers.get_list("vary") == ["Accept-Encoding"]
+    assert not_modified.status_code == 304
+    assert not_modified.headers.get_list("vary") == ["Accept-Encoding"]
+    assert any_match.status_code == 304
+    assert any_match.headers.get_list("vary") == ["Accept-Encoding"]
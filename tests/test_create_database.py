@@ -0,0 +1,231 @@
+import sqlite3
+from collections import Counter
+
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel, create_engine, func, select
+from sqlmodel.pool import StaticPool
+
+from src.app.create_database import (
+    add_missing_indexes,
+    bake_database,
+    expand_family_breeding,
+    load_all_csv_data,
+)
+from src.app.database import create_db_engine
+from src.app.settings import Settings
+from src.app.models import (
+    Item,
+    MonsterBreedingExpansion,
+    MonsterBreedingLink,
+    MonsterDetail,
+    Skill,
+)
+
+
+def _index_names(engine):
+    inspector = inspect(engine)
+    return {
+        index["name"]
+        for table in inspector.get_table_names()
+        for index in inspector.get_indexes(table)
+    }
+
+
+def test_add_missing_indexes():
+    """
+    Adds the indexes declared in models.py to a database whose tables were
+    created without them.
+    """
+    test_engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(test_engine)
+    with test_engine.begin() as connection:
+        for name in _index_names(test_engine):
+            connection.exec_driver_sql(f"DROP INDEX {name}")
+    assert _index_names(test_engine) == set()
+
+    add_missing_indexes(test_engine)
+    indexes = _index_names(test_engine)
+
+    assert "ix_monsterbreedinglink_child_id" in indexes
+    assert "ix_monsterbreedinglink_pedigree_id" in indexes
+    assert "ix_monsterbreedinglink_parent2_id" in indexes
+    assert "ix_monsterskilllink_monster_id" in indexes
+    assert "ix_skillcombine_combo_skill_id" in indexes
+    assert "ix_monsterdetail_family_id" in indexes
+    assert "ix_skill_category_type_family_type" in indexes
+    assert "ix_item_item_category_sell_location" in indexes
+
+    # running it again on an up to date database is a no-op
+    add_missing_indexes(test_engine)
+    assert _index_names(test_engine) == indexes
+
+
+def test_load_all_csv_data(tmp_path):
+    """
+    Bulk loads every csv file. Loading again skips rows whose id exists.
+    """
+    test_engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+
+    load_all_csv_data(test_engine)
+    load_all_csv_data(test_engine)
+
+    with Session(test_engine) as session:
+        counts = {
+            Model: session.exec(select(func.count()).select_from(Model)).one()
+            for Model in [Item, MonsterDetail, MonsterBreedingLink, Skill]
+        }
+        monster = session.get(MonsterDetail, 110)
+        skill = session.get(Skill, 2)
+
+    assert counts == {
+        Item: 47,
+        MonsterDetail: 215,
+        MonsterBreedingLink: 983,
+        Skill: 154,
+    }
+    assert monster is not None
+    assert skill is not None
+    assert monster.old_name == "Watabou"
+    assert monster.family_id == 5
+    # csv header is "ID" in the skills file
+    assert skill.old_name == "Blazemore"
+    assert skill.upgrade_to_id == 3
+    assert skill.required_hp is None
+    assert "ix_monsterbreedinglink_child_id" in _index_names(test_engine)
+
+
+def test_load_all_csv_data_keeps_journal_mode(tmp_path):
+    """
+    The load turns the journal off for itself, then puts back the journal
+    mode the database was configured with.
+    """
+    test_engine = create_db_engine(
+        tmp_path / "test.db", Settings(db_journal_mode="WAL")
+    )
+
+    load_all_csv_data(test_engine)
+
+    test_engine.dispose()
+
+    # WAL is stored in the file, so a plain connection sees it too
+    connection = sqlite3.connect(tmp_path / "test.db")
+    journal_mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+    connection.close()
+    assert journal_mode == "wal"
+
+
+def test_expand_family_breeding(tmp_path):
+    """
+    Every family-wide parent slot is expanded to each monster of the family.
+    Expanding again replaces the rows.
+    """
+    test_engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    load_all_csv_data(test_engine)
+    expand_family_breeding(test_engine)
+
+    with Session(test_engine) as session:
+        family_of = {
+            monster.id: monster.family_id
+            for monster in session.exec(select(MonsterDetail))
+        }
+        links = {link.id: link for link in session.exec(select(MonsterBreedingLink))}
+        rows = session.exec(select(MonsterBreedingExpansion)).all()
+
+    family_links = [
+        link
+        for link in links.values()
+        if link.pedigree_id is None or link.parent2_id is None
+    ]
+    assert {row.link_id for row in rows} == {link.id for link in family_links}
+    for row in rows:
+        link = links[row.link_id]
+        assert row.child_id == link.child_id
+        if link.pedigree_id is None:
+            assert family_of[row.pedigree_id] == link.pedigree_family_id
+        else:
+            assert row.pedigree_id == link.pedigree_id
+        if link.parent2_id is None:
+            assert family_of[row.parent2_id] == link.family2_id
+        else:
+            assert row.parent2_id == link.parent2_id
+
+    # a link with two family parents gets one row per pair of members
+    link = next(
+        link
+        for link in family_links
+        if link.pedigree_id is None and link.parent2_id is None
+    )
+    assert link.pedigree_family_id is not None and link.family2_id is not None
+    members = Counter(family_of.values())
+    assert sum(1 for row in rows if row.link_id == link.id) == (
+        members[link.pedigree_family_id] * members[link.family2_id]
+    )
+    assert len(rows) == 44670
+
+
+def test_bake_database(tmp_path):
+    """
+    A baked database opens read-only and memory mapped, and cannot be written.
+    """
+    db_path = tmp_path / "database.db"
+    db_path.write_text("stale file replaced by the bake")
+
+    bake_database(db_path)
+    readonly_engine = create_db_engine(
+        db_path, Settings(db_readonly=True, db_mmap_size=2**20)
+    )
+
+    assert not (tmp_path / "database.db.build").exists()
+    with Session(readonly_engine) as session:
+        monster = session.get(MonsterDetail, 110)
+        assert monster is not None
+        assert monster.old_name == "Watabou"
+        mmap_size = session.connection().exec_driver_sql("PRAGMA mmap_size").scalar()
+        assert mmap_size == 2**20
+
+        session.add(
+            Item(
+                item_name="x",
+                item_category="x",
+                item_description="x",
+                sell_location="x",
+            )
+        )
+        with pytest.raises(OperationalError, match="readonly"):
+            session.commit()
+
+
+@pytest.mark.parametrize("db_pool", ["queue", "singleton", "static", "null"])
+def test_create_db_engine_settings(tmp_path, db_pool):
+    """
+    Engine settings choose the pool and set PRAGMAs on every connection.
+    """
+    db_settings = Settings(
+        db_pool=db_pool,
+        db_pool_size=3,
+        db_journal_mode="WAL",
+        db_cache_size=-8000,
+        db_temp_store="MEMORY",
+    )
+    test_engine = create_db_engine(tmp_path / "test.db", db_settings)
+
+    with test_engine.connect() as connection:
+        pragmas = {
+            name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in ["journal_mode", "cache_size", "temp_store"]
+        }
+
+    assert type(test_engine.pool).__name__.lower().startswith(db_pool)
+    assert pragmas == {"journal_mode": "wal", "cache_size": -8000, "temp_store": 2}
+    assert test_engine.echo is False
+
+
+def test_create_db_engine_unknown_pool(tmp_path):
+    with pytest.raises(ValueError, match="DQM_DB_POOL"):
+        create_db_engine(tmp_path / "test.db", Settings(db_pool="bogus"))
@@ -56,6 +56,12 @@ def test_read_monster(client_module, load_all_csvdata):
         "description": "A mischievous mystical creature",
         "family_id": 5,
         "id": 110,
+        "sprite": {
+            "image_url": "/sprites/b93796e2d5d95d8f/Watabou.png",
+            "width": 148,
+            "height": 160,
+            "content_hash": "b93796e2d5d95d8f",
+        },
         "family": {"family_eng": "PLANT", "id": 5},
     }
 
@@ -87,6 +93,12 @@ def test_read_monsterandskill(client_module, load_all_csvdata):
         "description": "A mischievous mystical creature",
         "family_id": 5,
         "id": 110,
+        "sprite": {
+            "image_url": "/sprites/b93796e2d5d95d8f/Watabou.png",
+            "width": 148,
+            "height": 160,
+            "content_hash": "b93796e2d5d95d8f",
+        },
         "family": {"family_eng": "PLANT", "id": 5},
         "skills": [
             {
@@ -44,6 +44,12 @@ def test_insert_monster(client: TestClient, session: Session):
         "old_name": "Slime",
         "description": "The most abundant of this popular specie",
         "family_id": 1,
+        "sprite": {
+            "image_url": "/sprites/2bf1309dd6f7a39c/Slime.png",
+            "width": 147,
+            "height": 158,
+            "content_hash": "2bf1309dd6f7a39c",
+        },
         "family": None,
     }
 
@@ -528,6 +534,12 @@ def test_monster_breeding_link(client: TestClient, session: Session):
                 "old_name": "DrakSlime",
                 "description": "Moves & jumps with its tail and wings",
                 "family_id": 1,
+                "sprite": {
+                    "image_url": "/sprites/3162887368a10dcf/DrakSlime.png",
+                    "width": 147,
+                    "height": 158,
+                    "content_hash": "3162887368a10dcf",
+                },
             },
             "pedigree": None,
             "parent2": None,
@@ -564,6 +576,12 @@ def test_monster_breeding_link(client: TestClient, session: Session):
                 "old_name": "FangSlime",
                 "description": "Has a red Mohawk and is very brave & proud",
                 "family_id": 1,
+                "sprite": {
+                    "image_url": "/sprites/a4a4f29cad5d5672/FangSlime.png",
+                    "width": 147,
+                    "height": 158,
+                    "content_hash": "a4a4f29cad5d5672",
+                },
             },
             "pedigree": None,
             "parent2": {
@@ -572,6 +590,12 @@ def test_monster_breeding_link(client: TestClient, session: Session):
                 "old_name": "Almiraj",
                 "description": ("When cornered, it charges with its sharp horns"),
                 "family_id": 3,
+                "sprite": {
+                    "image_url": "/sprites/03c2c28944d65186/Almiraj.png",
+                    "width": 148,
+                    "height": 160,
+                    "content_hash": "03c2c28944d65186",
+                },
             },
             "pedigree_family": {
                 "family_eng": "SLIME",
@@ -0,0 +1,22 @@
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from src.app.json_response import json_response_class
+
+
+def test_default_response_class_is_json_response():
+    assert json_response_class(False) is JSONResponse
+
+
+@pytest.mark.parametrize(
+    "path", ["/dqm1/monsters", "/dqm1/skills", "/dqm1/breeding/110"]
+)
+def test_orjson_renders_identical_bodies(
+    client_module: TestClient, load_all_csvdata, path: str
+):
+    pytest.importorskip("orjson")
+    response = client_module.get(path)
+    orjson_response_class = json_response_class(True)
+
+    assert orjson_response_class(response.json()).body == response.content
@@ -0,0 +1,149 @@
+import pytest
+
+
+@pytest.mark.parametrize("path", ["dqm1/monsters", "dqm1/skills", "dqm1/items"])
+def test_keyset_pages(client_module, load_all_csvdata, path):
+    """
+    Following X-Next-Cursor page by page returns the full list once.
+    """
+    expected = client_module.get(path).json()
+
+    rows = []
+    params = {"limit": 20}
+    while True:
+        response = client_module.get(path, params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 20
+        rows.extend(page)
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if next_cursor is None:
+            break
+        assert int(next_cursor) == page[-1]["id"]
+        params["cursor"] = next_cursor
+
+    assert rows == expected
+
+
+def test_keyset_page_with_filter(client_module, load_all_csvdata):
+    response = client_module.get("dqm1/monsters?family=2&limit=10&cursor=30")
+    monsters = response.json()
+
+    assert response.status_code == 200
+    assert len(monsters) == 10
+    assert all(monster["family_id"] == 2 for monster in monsters)
+    assert all(monster["id"] > 30 for monster in monsters)
+    assert response.headers["X-Next-Cursor"] == str(monsters[-1]["id"])
+
+
+def test_last_page_has_no_cursor(client_module, load_all_csvdata):
+    response = client_module.get("dqm1/items?limit=50")
+
+    assert len(response.json()) == 47
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_cors_exposes_pagination_headers(client_module, load_all_csvdata):
+    """
+    Cross-origin browser clients may read X-Next-Cursor and X-Missing-Ids.
+    """
+    response = client_module.get(
+        "dqm1/monsters",
+        params={"limit": 2},
+        headers={"Origin": "http://localhost:3000"},
+    )
+    assert response.status_code == 200
+    exposed = response.headers["Access-Control-Expose-Headers"].split(", ")
+    assert "X-Next-Cursor" in exposed
+    assert "X-Missing-Ids" in exposed
+
+
+def test_fields(client_module, load_all_csvdata):
+    response = client_module.get("dqm1/monsters?fields=new_name,old_name&limit=2")
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": 1, "new_name": "Drake Slime", "old_name": "DrakSlime"},
+        {"id": 2, "new_name": "Mottle Slime", "old_name": "SpotSlime"},
+    ]
+    assert response.headers["X-Next-Cursor"] == "2"
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "dqm1/monsters?fields=id",
+        "dqm1/skills?fields=id&limit=2",
+        "dqm1/items?fields=",
+    ],
+)
+def test_fields_id_only(client_module, load_all_csvdata, path):
+    """
+    A projection down to the id column alone still returns objects.
+    """
+    response = client_module.get(path)
+
+    assert response.status_code == 200
+    rows = response.json()
+    assert rows[:2] == [{"id": 1}, {"id": 2}]
+
+
+def test_fields_select_only_those_columns(
+    client_module, session_module, load_all_csvdata, count_queries
+):
+    with count_queries(session_module.get_bind()) as queries:
+        response = client_module.get("dqm1/skills?fields=old_name&category=Recovery")
+
+    assert response.status_code == 200
+    assert all(set(skill) == {"id", "old_name"} for skill in response.json())
+    assert len(queries) == 1
+    assert "description" not in queries[0]
+
+
+def test_fields_unknown(client_module, load_all_csvdata):
+    response = client_module.get("dqm1/items?fields=item_name,colour")
+
+    assert response.status_code == 422
+    assert "colour" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("path", ["dqm1/monsters", "dqm1/skills"])
+def test_batch_lookup_keeps_request_order(client_module, load_all_csvdata, path):
+    response = client_module.get(path, params={"ids": "9,1,999,5,1"})
+    rows = response.json()
+
+    assert response.status_code == 200
+    assert [row["id"] for row in rows] == [9, 1, 5]
+    assert response.headers["X-Missing-Ids"] == "999"
+
+
+def test_batch_lookup_matches_single_lookups(client_module, load_all_csvdata):
+    monsters = client_module.get("dqm1/monsters", params={"ids": "110,5"}).json()
+    assert monsters == [
+        client_module.get("dqm1/monsters/110").json(),
+        client_module.get("dqm1/monsters/5").json(),
+    ]
+
+
+def test_batch_lookup_with_filter_and_fields(client_module, load_all_csvdata):
+    response = client_module.get(
+        "dqm1/monsters", params={"ids": "110,1", "family": 5, "fields": "old_name"}
+    )
+
+    assert response.json() == [{"id": 110, "old_name": "Watabou"}]
+    assert response.headers["X-Missing-Ids"] == "1"
+
+
+def test_batch_lookup_without_missing_ids(client_module, load_all_csvdata):
+    response = client_module.get("dqm1/skills", params={"ids": "3,2"})
+
+    assert [skill["id"] for skill in response.json()] == [3, 2]
+    assert "X-Missing-Ids" not in response.headers
+
+
+@pytest.mark.parametrize(
+    "params",
+    [{"ids": "1,x"}, {"ids": "1,2", "limit": 5}, {"ids": "1", "cursor": 3}],
+)
+def test_batch_lookup_rejects_bad_requests(client_module, params):
+    assert client_module.get("dqm1/monsters", params=params).status_code == 422
@@ -0,0 +1,68 @@
+import zlib
+
+import pytest
+
+from src.app.png import PngImage, read_png, read_size, write_png
+from src.app.sprites import pack_atlas, sprite_store
+
+
+def _image(width: int, height: int, value: int) -> PngImage:
+    return PngImage(width, height, 2, [bytes([value]) * width * 3] * height)
+
+
+def test_round_trip():
+    rows = [bytes(range(y, y + 12)) for y in range(3)]
+    image = PngImage(4, 3, 2, rows)
+    data = write_png(image)
+
+    assert read_size(data) == (4, 3)
+    assert read_png(data) == image
+
+
+@pytest.mark.parametrize("filter_type", [1, 2, 3, 4])
+def test_read_filtered_scanlines(filter_type):
+    """
+    the sprites only use filter type 0, the others are decoded by hand:
+    rows of a constant byte are filtered here and must decode back.
+    """
+    original = write_png(PngImage(2, 2, 2, [bytes([10] * 6), bytes([30] * 6)]))
+    stride = 6
+    if filter_type == 1:  # Sub
+        filtered = [bytes([10] * 3 + [0] * 3), bytes([30] * 3 + [0] * 3)]
+    elif filter_type == 2:  # Up
+        filtered = [bytes([10] * 6), bytes([20] * 6)]
+    elif filter_type == 3:  # Average
+        filtered = [bytes([10] * 3 + [5] * 3), bytes([25] * 3 + [10] * 3)]
+    else:  # Paeth
+        filtered = [bytes([10] * 3 + [0] * 3), bytes([20] * 3 + [0] * 3)]
+    raw = b"".join(bytes([filter_type]) + row for row in filtered)
+    assert all(len(row) == stride for row in filtered)
+
+    header_end = original.index(b"IDAT") - 4
+    idat = zlib.compress(raw)
+    data = (
+        original[:header_end]
+        + len(idat).to_bytes(4, "big")
+        + b"IDAT"
+        + idat
+        + zlib.crc32(b"IDAT" + idat).to_bytes(4, "big")
+        + original[-12:]
+    )
+    assert read_png(data).rows == [bytes([10] * 6), bytes([30] * 6)]
+
+
+def test_every_sprite_decodes():
+    for sprite in sprite_store.sprites.values():
+        image = read_png(sprite.data)
+        assert (image.width, image.height) == read_size(sprite.data)
+
+
+def test_pack_atlas_places_images_on_a_grid():
+    images = {1: _image(2, 3, 1), 2: _image(3, 2, 2), 3: _image(1, 1, 3)}
+    atlas, frames = pack_atlas(images)
+
+    assert (atlas.width, atlas.height) == (6, 6)
+    assert frames[2].x == 3 and frames[2].y == 0
+    assert frames[3].x == 0 and frames[3].y == 3
+    assert atlas.rows[0] == bytes([1] * 6 + [0] * 3 + [2] * 9)
+    assert atlas.rows[3] == bytes([3] * 3 + [0] * 15)
@@ -0,0 +1,94 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from src.app.main import app, get_session
+
+
+@pytest.fixture(name="engine_module", scope="module")
+def engine_module_fixture(session_module, load_all_csvdata):
+    return session_module.get_bind()
+
+
+@pytest.fixture(name="client_fresh_session", scope="module")
+def client_fresh_session_fixture(engine_module):
+    """
+    client opening a new session per request, like the app does, so nothing is
+    served from an identity map filled by an earlier request
+    """
+
+    def get_session_override():
+        with Session(engine_module) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize(
+    "path, expected_queries",
+    [
+        ("dqm1/monsters", 1),
+        ("dqm1/monsters?family=2", 1),
+        ("dqm1/monsters?ids=110,5,9,999", 1),
+        ("dqm1/monsters/110", 1),
+        ("dqm1/monstersandskill/110", 2),
+        ("dqm1/family/4", 2),
+        ("dqm1/skills", 1),
+        ("dqm1/skills?category=Recovery", 1),
+        ("dqm1/skills?ids=30,2,7", 1),
+        ("dqm1/skills/2", 1),
+        ("dqm1/skills/2/chain", 0),
+        ("dqm1/skillcombine/4", 1),
+        ("dqm1/items", 1),
+        ("dqm1/items/3", 1),
+        ("dqm1/breeding/5", 0),
+        ("dqm1/breeding/5?include_family=true", 0),
+    ],
+)
+def test_query_count(
+    client_fresh_session, engine_module, count_queries, path, expected_queries
+):
+    """
+    Number of SQL statements per request. A higher count usually means a
+    relationship is lazy loaded once per row (N+1 queries) during serialization.
+    """
+    # first request builds any per-database index the route uses
+    client_fresh_session.get(path)
+
+    with count_queries(engine_module) as queries:
+        response = client_fresh_session.get(path)
+
+    assert response.status_code == 200
+    assert len(queries) == expected_queries, "\n".join(queries)
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "dqm1/skills",
+        "dqm1/skills?ids=30,2,7",
+        "dqm1/monstersandskill/110",
+        "dqm1/skillcombine/4",
+    ],
+)
+def test_skill_queries_skip_unused_joins(
+    client_fresh_session, engine_module, count_queries, path
+):
+    """
+    Skill's upgrades and SkillCombine.combo_skill are joined relationships
+    these responses never serialize, so their queries must not join them.
+    """
+    with count_queries(engine_module) as queries:
+        client_fresh_session.get(path)
+
+    assert queries
+    for join in (
+        "upgrade_to_id = skill_",
+        "upgrade_from_id = skill_",
+        "combo_skill_id = skill_",
+    ):
+        assert not any(join in query for query in queries), "\n".join(queries)
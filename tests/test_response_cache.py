@@ -0,0 +1,113 @@
+import anyio
+import pytest
+from fastapi.testclient import TestClient
+
+from src.app.main import app, response_cache_paths
+from src.app.response_cache import (
+    CachedResponse,
+    ResponseCache,
+    ResponseCacheMiddleware,
+    cache_key,
+    warm_up,
+)
+
+
+def _entry(body: bytes) -> CachedResponse:
+    return CachedResponse(status=200, headers=[], body=body)
+
+
+def test_cache_key_sorts_query_parameters():
+    assert cache_key("/dqm1/items", b"category=a&selllocation=b") == cache_key(
+        "/dqm1/items", b"selllocation=b&category=a"
+    )
+    assert cache_key("/dqm1/items", b"") != cache_key("/dqm1/items", b"limit=5")
+
+
+def test_cache_evicts_least_recently_used_entry():
+    cache = ResponseCache(max_entries=2)
+    cache.put(("/a", ""), _entry(b"a"))
+    cache.put(("/b", ""), _entry(b"b"))
+    cache.get(("/a", ""))
+    cache.put(("/c", ""), _entry(b"c"))
+
+    assert cache.get(("/b", "")) is None
+    entry = cache.get(("/a", ""))
+    assert entry is not None
+    assert entry.body == b"a"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_respects_max_bytes():
+    cache = ResponseCache(max_bytes=10)
+    cache.put(("/a", ""), _entry(b"123456"))
+    cache.put(("/b", ""), _entry(b"123456"))
+    cache.put(("/big", ""), _entry(b"x" * 11))
+
+    assert len(cache) == 1
+    assert cache.stats()["bytes"] == 6
+    assert cache.get(("/big", "")) is None
+
+
+@pytest.fixture(name="cached_client")
+def cached_client_fixture(client_module: TestClient, load_all_csvdata):
+    # client_module installs the test session override on app. The cache
+    # wraps the whole app here, so ask for identity bodies by default: the
+    # app's own compression runs inside it, unlike in main.py.
+    cache = ResponseCache()
+    client = TestClient(
+        ResponseCacheMiddleware(app, cache, encodings=["gzip"]),
+        headers={"Accept-Encoding": "identity"},
+    )
+    yield client, cache
+
+
+def test_middleware_serves_identical_response_from_cache(cached_client):
+    client, cache = cached_client
+    first = client.get("/dqm1/monsters", params={"limit": 3})
+    second = client.get("/dqm1/monsters", params={"limit": 3})
+
+    assert first.headers["x-cache"] == "MISS"
+    assert second.headers["x-cache"] == "HIT"
+    assert second.content == first.content
+    assert second.headers["x-next-cursor"] == first.headers["x-next-cursor"]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_middleware_skips_errors_and_other_paths(cached_client):
+    client, cache = cached_client
+    client.get("/dqm1/monsters/999")
+    client.get("/")
+
+    assert client.get("/dqm1/monsters/999").headers["x-cache"] == "MISS"
+    assert "x-cache" not in client.get("/").headers
+    assert len(cache) == 0
+
+
+def test_warm_up_fills_cache(cached_client):
+    client, cache = cached_client
+    paths = ["/dqm1/skills?category=Attack", "/dqm1/items/1"]
+    anyio.run(warm_up, client.app, paths)
+
+    assert len(cache) == 2
+    assert client.get("/dqm1/items/1").headers["x-cache"] == "HIT"
+
+
+def test_warm_up_paths_include_skill_combos(session_module, load_all_csvdata):
+    paths = response_cache_paths(session_module)
+
+    assert "/dqm1/skillcombine/4" in paths
+    assert len(paths) == len(set(paths))
+
+
+def test_hits_are_sent_precompressed(cached_client):
+    client, cache = cached_client
+    client.get("/dqm1/monsters", headers={"Accept-Encoding": "identity"})
+    entry = cache.get(("/dqm1/monsters", ""))
+    assert "gzip" in entry.variants
+
+    response = client.get("/dqm1/monsters", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["x-cache"] == "HIT"
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) == len(entry.variants["gzip"])
+    assert response.content == entry.body
@@ -0,0 +1,103 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from src.app.search import (
+    AutocompleteIndex,
+    SearchDocument,
+    SearchIndex,
+    trigrams,
+    words,
+)
+
+
+def test_words_split_camel_case_names():
+    assert words("DrakSlime") == ["drakslime", "drak", "slime"]
+    assert words("Metal king slime!") == ["metal", "king", "slime"]
+
+
+def test_trigrams_pad_word_start():
+    assert trigrams("ab") == {"  a", " ab", "ab "}
+
+
+def test_index_ranks_names_above_descriptions():
+    index = SearchIndex(
+        [
+            SearchDocument("skill", 1, "Blaze", ("Blaze",), "Small fire"),
+            SearchDocument("skill", 2, "Firebal", ("Firebal",), "A blaze of fire"),
+        ]
+    )
+    results = index.search("blaze")
+    assert [result.id for result in results] == [1, 2]
+    assert results[0].score > results[1].score
+
+
+def test_search_tolerates_typos(client_module: TestClient, load_all_csvdata):
+    response = client_module.get("dqm1/search", params={"q": "drake slme"})
+    assert response.status_code == 200
+    best = response.json()[0]
+    assert (best["kind"], best["name"]) == ("monster", "Drake Slime")
+    assert best["score"] > response.json()[1]["score"]
+
+
+def test_search_filters_by_kind(client_module: TestClient, load_all_csvdata):
+    response = client_module.get("dqm1/search", params={"q": "herb", "kind": "item"})
+    results = response.json()
+    assert results
+    assert {result["kind"] for result in results} == {"item"}
+    assert results[0]["name"] == "Herb"
+
+    response = client_module.get("dqm1/search", params={"q": "herb", "kind": "weapon"})
+    assert response.status_code == 422
+
+
+def test_search_limit(client_module: TestClient, load_all_csvdata):
+    response = client_module.get("dqm1/search", params={"q": "slime", "limit": 3})
+    assert len(response.json()) == 3
+
+    assert client_module.get("dqm1/search", params={"q": ""}).status_code == 422
+
+
+def test_search_is_sub_millisecond(session_module, load_all_csvdata):
+    index = SearchIndex.load(session_module)
+    runs = 200
+    start = time.perf_counter()
+    for _ in range(runs):
+        index.search("metal kng slime")
+    # generous bound for slow CI machines, typically ~0.3ms
+    assert (time.perf_counter() - start) / runs < 0.005
+
+
+def test_autocomplete_index_orders_name_starts_first():
+    index = AutocompleteIndex(
+        [
+            ("monster", 1, "Drake Slime"),
+            ("monster", 2, "Slime"),
+            ("monster", 2, "Slime"),
+            ("skill", 3, "SlimeBlow"),
+            ("monster", 4, "Dracky"),
+        ]
+    )
+    assert [match.id for match in index.complete("slime")] == [2, 3, 1]
+    assert [match.id for match in index.complete("SLI", kind="skill")] == [3]
+    assert [match.id for match in index.complete("dr", limit=1)] == [4]
+    assert index.complete("x") == []
+
+
+def test_autocomplete(client_module: TestClient, load_all_csvdata):
+    response = client_module.get(
+        "dqm1/autocomplete", params={"prefix": "slime", "kind": "monster"}
+    )
+    assert response.status_code == 200
+    names = [match["name"] for match in response.json()]
+    assert names[0] == "Slime"
+    assert "Drake Slime" in names
+    assert {match["kind"] for match in response.json()} == {"monster"}
+
+    response = client_module.get("dqm1/autocomplete", params={"prefix": "draksli"})
+    assert [match["name"] for match in response.json()] == ["DrakSlime"]
+
+    response = client_module.get(
+        "dqm1/autocomplete", params={"prefix": "he", "kind": "item"}
+    )
+    assert response.status_code == 422
@@ -0,0 +1,158 @@
+from src.app.models import Skill, SkillCombine, StatProfile
+from src.app.skills import SkillGraph, SkillRequirements
+
+
+def _skill(skill_id, upgrade_to_id=None, **requirements):
+    return Skill(
+        id=skill_id,
+        category_type="attack",
+        family_type="fire",
+        old_name=f"Skill{skill_id}",
+        description="",
+        mp_cost=1,
+        required_level=requirements.pop("required_level", 1),
+        upgrade_to_id=upgrade_to_id,
+        **requirements,
+    )
+
+
+def _graph():
+    """
+    1 -> 2 -> 3 upgrade, 4 upgrades to itself, 5 needs 1 and 4, 6 needs 3 and 5
+    """
+    skills = [_skill(1, 2), _skill(2, 3), _skill(3), _skill(4, 4), _skill(5), _skill(6)]
+    combos = [
+        SkillCombine(id=1, combo_skill_id=5, needed_skill_id=1),
+        SkillCombine(id=2, combo_skill_id=5, needed_skill_id=4),
+        SkillCombine(id=3, combo_skill_id=6, needed_skill_id=3),
+        SkillCombine(id=4, combo_skill_id=6, needed_skill_id=5),
+    ]
+    return SkillGraph(skills, combos, {10: [1], 11: [4]})
+
+
+def test_skill_graph_indexes():
+    graph = _graph()
+
+    assert graph.upgrades_after[1] == [2, 3]
+    assert graph.upgrades_after[4] == []
+    assert graph.combo_needs == {5: [1, 4], 6: [3, 5]}
+    assert graph.needed_for[3] == [6]
+
+
+def test_skill_graph_chains():
+    graph = _graph()
+
+    assert graph.chains[1] == graph.chains[3] == [1, 2, 3]
+    assert graph.chains[4] == [4]
+    assert [skill.id for skill in graph.chain(2)] == [1, 2, 3]
+
+
+def test_learnable_chains_upgrades_and_combos():
+    learned = _graph().learnable(10, inherited=[4])
+
+    assert [
+        (skill.skill.id, skill.source, skill.from_skill_ids) for skill in learned
+    ] == [
+        (1, "natural", []),
+        (4, "inherited", []),
+        (2, "upgrade", [1]),
+        (3, "upgrade", [2]),
+        (5, "combo", [1, 4]),
+        (6, "combo", [3, 5]),
+    ]
+
+
+def test_learnable_needs_every_combo_skill():
+    learned = _graph().learnable(11)
+
+    assert [skill.skill.id for skill in learned] == [4]
+
+
+def test_read_learnable_skills(client_module, load_all_csvdata):
+    response = client_module.get("dqm1/monsters/1/learnable")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["monster_id"] == 1
+    natural = [skill["skill"]["id"] for skill in data["skills"][:3]]
+    assert {skill["source"] for skill in data["skills"][:3]} == {"natural"}
+
+    response = client_module.get(
+        "dqm1/monsters/1/learnable", params={"inherited": "2,122"}
+    )
+    skills = {skill["skill"]["id"]: skill for skill in response.json()["skills"]}
+    assert set(natural) < set(skills)
+    assert skills[3]["source"] == "upgrade"
+    assert skills[4]["source"] == "combo"
+    assert skills[4]["from_skill_ids"] == [2, 122]
+
+
+def test_read_learnable_skills_fail(client_module, load_all_csvdata):
+    assert client_module.get("dqm1/monsters/9999/learnable").status_code == 404
+    response = client_module.get(
+        "dqm1/monsters/1/learnable", params={"inherited": "9999"}
+    )
+    assert response.status_code == 404
+    response = client_module.get("dqm1/monsters/1/learnable", params={"inherited": "a"})
+    assert response.status_code == 422
+
+
+def test_read_skill_chain(client_module, load_all_csvdata):
+    for skill_id in (1, 2, 3):
+        response = client_module.get(f"dqm1/skills/{skill_id}/chain")
+        assert response.status_code == 200
+        assert [skill["old_name"] for skill in response.json()] == [
+            "Blaze",
+            "Blazemore",
+            "Blazemost",
+        ]
+
+    assert client_module.get("dqm1/skills/9999/chain").status_code == 404
+
+
+def test_skill_requirements_filter():
+    requirements = SkillRequirements(
+        [
+            _skill(3, required_level=20, required_attack=100),
+            _skill(1),
+            _skill(2, required_level=10, required_mp=50),
+        ]
+    )
+
+    def eligible(**stats):
+        return [skill.id for skill in requirements.eligible(StatProfile(**stats))]
+
+    assert eligible() == [1, 2, 3]
+    assert eligible(level=10) == [1, 2]
+    assert eligible(level=10, mp=49) == [1]
+    assert eligible(level=20, attack=100, mp=0) == [1, 3]
+    assert eligible(level=0) == []
+    assert requirements.eligible_ids(
+        [StatProfile(level=5), StatProfile(level=99, mp=99, attack=99)]
+    ) == [[1], [1, 2]]
+
+
+def test_read_eligible_skills(client_module, load_all_csvdata):
+    response = client_module.get("dqm1/skills/eligible", params={"level": 10})
+    assert response.status_code == 200
+    skills = response.json()
+    assert skills
+    assert all(skill["required_level"] <= 10 for skill in skills)
+    assert [skill["id"] for skill in skills] == sorted(skill["id"] for skill in skills)
+
+    response = client_module.get("dqm1/skills/eligible", params={"level": 99, "mp": 0})
+    assert all(not skill["required_mp"] for skill in response.json())
+
+    response = client_module.get("dqm1/skills/eligible", params={"level": "a"})
+    assert response.status_code == 422
+
+
+def test_read_eligible_skills_batch(client_module, load_all_csvdata):
+    profiles = [{"level": 10}, {"level": 99, "mp": 0}, {}]
+    response = client_module.post("dqm1/skills/eligible", json=profiles)
+    assert response.status_code == 200
+    for profile, skill_ids in zip(profiles, response.json()):
+        expected = client_module.get("dqm1/skills/eligible", params=profile)
+        assert skill_ids == [skill["id"] for skill in expected.json()]
+
+    response = client_module.post("dqm1/skills/eligible", json=[{}] * 1001)
+    assert response.status_code == 422
@@ -0,0 +1,88 @@
+import pytest
+from sqlmodel import Session
+
+from src.app.main import app, get_snapshot
+from src.app.snapshot import Snapshot
+
+
+@pytest.fixture(name="snapshot", scope="module")
+def snapshot_fixture(session_module, load_all_csvdata):
+    # load through a separate session that is closed afterwards, the same
+    # way the app does at startup, so every row in the snapshot is detached
+    with Session(session_module.get_bind()) as session:
+        snapshot = Snapshot.load(session)
+    return snapshot
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "dqm1/monsters",
+        "dqm1/monsters?family=2",
+        "dqm1/monsters?family=2&limit=5&cursor=30",
+        "dqm1/monsters?fields=old_name,family_id&limit=3",
+        "dqm1/monsters?fields=id",
+        "dqm1/monsters?fields=",
+        "dqm1/monsters?ids=110,5,9,999,5",
+        "dqm1/monsters?ids=110,5,9&family=5&fields=old_name",
+        "dqm1/monsters/110",
+        "dqm1/monsters/999",
+        "dqm1/monstersandskill/110",
+        "dqm1/family/4",
+        "dqm1/family/15",
+        "dqm1/skills",
+        "dqm1/skills?category=Recovery",
+        "dqm1/skills?skill_family=Zap",
+        "dqm1/skills?category=Attack&skill_family=Frizz",
+        "dqm1/skills?ids=30,2,7,500",
+        "dqm1/skills?ids=30,2,7&category=Attack",
+        "dqm1/skills?fields=id&limit=2",
+        "dqm1/skills?ids=30,2,7&fields=id",
+        "dqm1/skills/2",
+        "dqm1/skills/300",
+        "dqm1/skillcombine/4",
+        "dqm1/items",
+        "dqm1/items?category=meat",
+        "dqm1/items?limit=10&cursor=40&fields=item_name",
+        "dqm1/items?fields=id&limit=2",
+        "dqm1/items?selllocation=Bazaar shop 4",
+        "dqm1/items/3",
+        "dqm1/items/50",
+        "dqm1/breeding/1",
+        "dqm1/breeding/110",
+        "dqm1/breeding/110?include_family=true",
+        "dqm1/breeding/plan?target=110&roster=1,2,3,4,5,6,7,8,9,10",
+        "dqm1/breeding/reachable?roster=1,4,7,10,13,16,19,22,25,28",
+        "dqm1/sprites/atlas?ids=1,5,999",
+        "dqm1/sprites/missing",
+        "dqm1/search?q=drake slme",
+        "dqm1/search?q=heal&kind=skill&limit=20",
+        "dqm1/autocomplete?prefix=sl",
+        "dqm1/skills/eligible?level=10&mp=20",
+        "dqm1/skills/2/chain",
+        "dqm1/skills/9/chain",
+        "dqm1/monsters/1/learnable",
+        "dqm1/monsters/1/learnable?inherited=2,122",
+        "dqm1/autocomplete?prefix=slime&kind=monster&limit=50",
+    ],
+)
+def test_snapshot_matches_database(client_module, snapshot, path):
+    """
+    Snapshot mode must return exactly what the database queries return.
+    """
+    expected = client_module.get(path)
+
+    app.dependency_overrides[get_snapshot] = lambda: snapshot
+    try:
+        response = client_module.get(path)
+    finally:
+        del app.dependency_overrides[get_snapshot]
+
+    assert response.status_code == expected.status_code
+    assert response.json() == expected.json()
+    assert response.headers.get("X-Next-Cursor") == expected.headers.get(
+        "X-Next-Cursor"
+    )
+    assert response.headers.get("X-Missing-Ids") == expected.headers.get(
+        "X-Missing-Ids"
+    )
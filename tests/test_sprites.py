@@ -0,0 +1,246 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src.app.main import app
+from src.app.models import MonsterDetail, MonsterFamily
+from src.app.png import read_png
+from src.app.sprites import (
+    MonsterSpriteIndex,
+    Sprite,
+    SpriteFiles,
+    SpriteStore,
+    atlas_monster_ids,
+    parse_range,
+    sprite_store,
+)
+
+SPRITE_NAME = "DeathMore 1.png"
+
+
+def _get(store: SpriteStore, name: str) -> Sprite:
+    sprite = store.get(name)
+    assert sprite is not None
+    return sprite
+
+
+@pytest.fixture(name="sprite_client")
+def sprite_client_fixture():
+    return TestClient(app)
+
+
+def test_store_loads_every_sprite():
+    sprite = _get(sprite_store, SPRITE_NAME)
+    names = [name for name in sprite_store.sprites if not name.startswith("atlas")]
+    assert len(names) == 215
+    assert sprite.data.startswith(b"\x89PNG")
+    assert sprite.url == f"/sprites/{sprite.content_hash}/DeathMore%201.png"
+
+
+def test_hashed_url_is_immutable(sprite_client: TestClient):
+    sprite = _get(sprite_store, SPRITE_NAME)
+    response = sprite_client.get(sprite.url)
+
+    assert response.status_code == 200
+    assert response.content == sprite.data
+    assert response.headers["content-type"] == "image/png"
+    assert "immutable" in response.headers["cache-control"]
+    assert response.headers["etag"] == sprite.etag
+
+
+def test_unhashed_url_redirects_to_current_hash(sprite_client: TestClient):
+    sprite = _get(sprite_store, SPRITE_NAME)
+    response = sprite_client.get("/sprites/DeathMore 1.png", follow_redirects=False)
+
+    assert response.status_code == 307
+    assert response.headers["location"] == sprite.url
+
+
+def test_stale_hash_and_unknown_name_are_404(sprite_client: TestClient):
+    assert (
+        sprite_client.get("/sprites/0000000000000000/DeathMore 1.png").status_code
+        == 404
+    )
+    assert sprite_client.get("/sprites/NoSuchMonster.png").status_code == 404
+
+
+def test_if_none_match_returns_304(sprite_client: TestClient):
+    sprite = _get(sprite_store, SPRITE_NAME)
+    response = sprite_client.get(sprite.url, headers={"If-None-Match": sprite.etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_range_request(sprite_client: TestClient):
+    sprite = _get(sprite_store, SPRITE_NAME)
+    size = len(sprite.data)
+    response = sprite_client.get(sprite.url, headers={"Range": "bytes=0-7"})
+
+    assert response.status_code == 206
+    assert response.content == sprite.data[:8]
+    assert response.headers["content-range"] == f"bytes 0-7/{size}"
+
+    response = sprite_client.get(sprite.url, headers={"Range": f"bytes={size}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{size}"
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=0-99", (0, 99)),
+        ("bytes=10-", (10, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=990-2000", (990, 999)),
+        ("bytes=0-1,5-6", None),
+        ("items=0-1", None),
+    ],
+)
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize(
+    "header", ["bytes=1000-", "bytes=5-2", "bytes=a-b", "bytes=-0"]
+)
+def test_parse_range_unsatisfiable(header):
+    with pytest.raises(ValueError):
+        parse_range(header, 1000)
+
+
+def test_atlas_endpoint(client_module: TestClient, load_all_csvdata):
+    response = client_module.get("/dqm1/sprites/atlas", params={"ids": "5,1,999,1"})
+    atlas = response.json()
+
+    assert response.status_code == 200
+    assert set(atlas["frames"]) == {"1", "5"}
+    assert atlas["missing"] == [999]
+
+    image_response = client_module.get(atlas["image_url"])
+    assert image_response.status_code == 200
+    assert "immutable" in image_response.headers["cache-control"]
+
+    image = read_png(image_response.content)
+    assert (image.width, image.height) == (atlas["width"], atlas["height"])
+    frame = atlas["frames"]["5"]
+    monster = client_module.get("/dqm1/monsters/5").json()
+    sprite = read_png(_get(sprite_store, f"{monster['old_name']}.png").data)
+    channels = image.channels
+    row = image.rows[frame["y"]]
+    assert (
+        row[frame["x"] * channels : (frame["x"] + frame["width"]) * channels]
+        == (sprite.rows[0])
+    )
+
+
+def test_full_atlas_has_every_monster(client_module: TestClient, load_all_csvdata):
+    atlas = client_module.get("/dqm1/sprites/atlas").json()
+    assert len(atlas["frames"]) == 215
+    assert atlas["missing"] == []
+
+
+def test_atlas_rejects_bad_ids(client_module: TestClient):
+    assert client_module.get("/dqm1/sprites/atlas?ids=1,x").status_code == 422
+    assert client_module.get("/dqm1/sprites/atlas?ids=").status_code == 422
+    assert client_module.get("/dqm1/sprites/atlas?ids=,").status_code == 422
+
+
+@pytest.mark.parametrize(
+    "name",
+    ["atlas-.png", "atlas-5-1.png", "atlas-1-1.png", "atlas-01.png", "atlas-x.png"],
+)
+def test_atlas_monster_ids_rejects_other_names(name):
+    with pytest.raises(ValueError):
+        atlas_monster_ids(name)
+
+
+def _index_of_store():
+    store = SpriteStore({})
+    for name in ["AgDevil.png", "Akubar.png", "Almiraj.png"]:
+        store.add(name, _get(sprite_store, name).data)
+    monsters = [(1, "AgDevil"), (2, "akubar"), (3, "Almiraj"), (4, "NoSprite")]
+    return store, MonsterSpriteIndex(monsters, store)
+
+
+def test_sprite_index_matches_old_name():
+    store, index = _index_of_store()
+    assert index.sprites[2].name == "Akubar.png"
+    assert [missing.monster_id for missing in index.missing] == [4]
+    assert index.missing[0].expected_file == "NoSprite.png"
+
+
+def test_atlases_are_evicted_from_the_store(monkeypatch):
+    monkeypatch.setattr("src.app.sprites.MAX_ATLASES", 2)
+    store, index = _index_of_store()
+    first = index.atlas([1])
+    index.atlas([2])
+    index.atlas([1, 2])
+
+    assert index.atlas([1]) is not first
+    assert store.get("atlas-2.png") is None
+    assert store.get("atlas-1-2.png") is not None
+
+
+def test_missing_atlas_image_is_rebuilt_from_its_name():
+    url = _index_of_store()[1].atlas([3, 1]).image_url
+    # another worker process, which has not built that atlas
+    store, index = _index_of_store()
+
+    def build_missing(name):
+        index.atlas(atlas_monster_ids(name))
+        return store.get(name)
+
+    client = TestClient(SpriteFiles(store, build_missing))
+    response = client.get(url.removeprefix("/sprites"))
+    assert response.status_code == 200
+    assert response.content == _get(store, "atlas-1-3.png").data
+
+
+def test_no_atlas_is_built_for_a_non_canonical_name():
+    """
+    atlas-3-1.png is not a name an atlas gets, so it is a 404 without
+    building the atlas of monsters 1 and 3.
+    """
+    store, index = _index_of_store()
+
+    def build_missing(name):
+        try:
+            monster_ids = atlas_monster_ids(name)
+        except ValueError:
+            return None
+        index.atlas(monster_ids)
+        return store.get(name)
+
+    client = TestClient(SpriteFiles(store, build_missing))
+    assert client.get("/atlas-3-1.png").status_code == 404
+    assert store.get("atlas-1-3.png") is None
+
+
+def test_monster_responses_link_their_sprite(
+    client_module: TestClient, load_all_csvdata
+):
+    monster = client_module.get("/dqm1/monsters/5").json()
+    sprite = sprite_store.find(monster["old_name"])
+    assert sprite is not None
+
+    assert monster["sprite"] == {
+        "image_url": sprite.url,
+        "width": sprite.width,
+        "height": sprite.height,
+        "content_hash": sprite.content_hash,
+    }
+    assert client_module.get(monster["sprite"]["image_url"]).content == sprite.data
+    assert client_module.get("/dqm1/sprites/missing").json() == []
+
+
+def test_monsters_without_sprite_are_reported(client: TestClient, session):
+    session.add(MonsterFamily(family_eng="SLIME"))
+    session.add(
+        MonsterDetail(new_name="Nobody", old_name="Nobody", description="", family_id=1)
+    )
+    session.commit()
+
+    assert client.get("/dqm1/monsters/1").json()["sprite"] is None
+    assert client.get("/dqm1/sprites/missing").json() == [
+        {"monster_id": 1, "old_name": "Nobody", "expected_file": "Nobody.png"}
+    ]